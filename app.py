@@ -1,15 +1,23 @@
 # import packages
+import uuid
+from contextlib import contextmanager
+from urllib.parse import parse_qs, urlencode
 
 # dahsboard
 import dash
 import dash_bootstrap_components as dbc
 import dash_core_components as dcc
 import dash_html_components as html
-from dash.dependencies import Input, Output, State
+from dash.dependencies import Input, Output, State, MATCH
+from dash.exceptions import PreventUpdate
 import dash_table
+from flask import jsonify, request
 
 # backend class
 from utils import Backend
+from sessions import SessionStore
+from jobs import DONE, FAILED, JobQueue
+from rvtools import cache_directory, spool_stream
 
 # Application initial state
 
@@ -58,8 +66,8 @@ controls = dbc.FormGroup(
                 'textAlign': 'center',
                 'margin': '10px'
             },
-            # Allow multiple files to be uploaded
-            # multiple=True
+            # Allow multiple files to be uploaded, one rvtools per vCenter
+            multiple=True
         ),
         html.P(id='file_name'),
         html.P('Exclude VM(s) Prowered Off ?', style={
@@ -87,14 +95,44 @@ controls = dbc.FormGroup(
             'textAlign': 'center'
         }),
         html.Br(),
+        # the options are searched on the server as the user types (see search_vm_options)
         dcc.Dropdown(
             id='out_vm',
-            # options=[
-            #    {'label': str(i), 'value': str(i)} for i in options
-            # ],
+            options=[],
             value=[],
+            placeholder='Type to search the VM(s)',
             multi=True
         ),
+        html.Br(),
+        html.H4('Remove VM(s) in bulk', style={
+            'textAlign': 'center'
+        }),
+        html.Br(),
+        dcc.Input(
+            id='out_vm_pattern',
+            type='text',
+            debounce=True,
+            placeholder='Name patterns, e.g. test-*, *-old',
+            style={'width': '100%'}
+        ),
+        html.Br(),
+        html.Br(),
+        dcc.Dropdown(
+            id='out_vm_folder',
+            options=[],
+            value=[],
+            placeholder='Folder(s)',
+            multi=True
+        ),
+        html.Br(),
+        dcc.Dropdown(
+            id='out_vm_cluster',
+            options=[],
+            value=[],
+            placeholder='Cluster(s)',
+            multi=True
+        ),
+        html.P(id='out_vm_count'),
         html.Hr(),
         dbc.Button(
             id='submit_button',
@@ -115,10 +153,14 @@ CARD_TEXT_STYLE = {
 
 content_main = html.Div(id='sizer_info')
 
+# stage of the sizing job running in the background, polled by job_poll
+content_status = html.Div(id='job_status')
+
 content = html.Div(
     [
         html.H2('Sizer Automation Prototype', style=TEXT_STYLE),
         html.Hr(),
+        content_status,
         content_main
     ],
     style=CONTENT_STYLE
@@ -133,45 +175,327 @@ sidebar = html.Div(
     style=SIDEBAR_STYLE,
 )
 
+
+def serve_layout():
+    """
+    Function creating the layout for each page load, so every browser tab gets its own session id.
+    """
+    return html.Div([
+        # "?upload=<key>&filename=<name>" opens an rvtools sent to the /upload route
+        dcc.Location(id='url', refresh=False),
+        dcc.Store(id='session_id', data=str(uuid.uuid4())),
+        # cache key of the uploaded rvtools, lets any worker restore the session
+        dcc.Store(id='upload_state'),
+        # id of the job parsing the uploaded rvtools and the timer polling it, only enabled while the job runs
+        dcc.Store(id='loading_job'),
+        dcc.Interval(id='load_poll', interval=500, disabled=True),
+        # id of the sizing job submitted and the timer polling its state, only enabled while the job runs
+        dcc.Store(id='sizing_job'),
+        dcc.Interval(id='job_poll', interval=500, disabled=True),
+        sidebar,
+        content
+    ])
+
+
 # create initial dashboard
-app = dash.Dash(external_stylesheets=[dbc.themes.BOOTSTRAP])
-app.layout = html.Div([sidebar, content])
+# the scope tabs and rvtools tables are only in the layout once a sizing is displayed, their callbacks are not checked
+# against the initial layout
+app = dash.Dash(external_stylesheets=[dbc.themes.BOOTSTRAP], suppress_callback_exceptions=True)
+app.layout = serve_layout
 
-# iniate backend class
-backend_class = Backend()
+# WSGI entry point (e.g. gunicorn app:server)
+server = app.server
 
+# one backend class per session
+sessions = SessionStore(Backend)
+
+# the sizing runs in background jobs so the web workers never block on the sizer, their state is shared on disk with the
+# other workers answering the polls
+jobs = JobQueue(directory=cache_directory('jobs'))
+
+# labels of the stages of a sizing job
+JOB_STAGES = {'queued': 'Waiting for a worker', 'summary': 'Computing the scopes', 'sizing': 'Calling the sizer',
+              'rendering': 'Building the results'}
+
+
+class SessionBusy(PreventUpdate):
+    """
+    Raised by session_backend when a job of the session holds its backend, the callback leaves its outputs unchanged.
+    """
+
+
+def sync_backend(backend_class, upload_state, options=None):
+    """
+    Function restoring the backend class of a session from the workbook cache if it does not hold the rvtools of
+    upload_state, and computing its scopes for the options of a submit.
+    Must be called with the lock of the backend held.
+    """
+    # the rvtools of the session may have been uploaded again on another worker
+    if upload_state and upload_state.get('hash') != backend_class.content_hash:
+        backend_class.filename = upload_state.get('filename')
+        if not backend_class.restore(upload_state.get('hash')):
+            backend_class.unload()
+
+    if options:
+        backend_class.apply_options(options)
 
-@app.callback([Output('file_name', 'children'),
-               Output('out_vm', 'options')],
-              Input('upload-data', 'contents'),
-              State('upload-data', 'filename'))
-def update_output1(contents, filename):
-    # initiate backend class
-    backend_class.contents, backend_class.filename = contents, filename
 
-    if contents is not None:
-        backend_class.open_rvtools()
+@contextmanager
+def session_backend(session_id, upload_state, sizing_job=None):
+    """
+    Context manager holding the lock of the backend class of a session, synced with upload_state and the options of the
+    last submit (see sync_backend). The jobs of the session hold the same lock while they change the backend, the web
+    requests do not wait for them: SessionBusy is raised instead.
+    """
+    backend_class = sessions.get(session_id)
 
-        vm_name = backend_class.vinfo.VM.values
-        out2 = [
-            {'label': str(i), 'value': str(i)} for i in vm_name
-        ]
-        return [str(filename), out2]
+    if not backend_class.lock.acquire(blocking=False):
+        raise SessionBusy()
+
+    try:
+        sync_backend(backend_class, upload_state, sizing_job.get('options') if sizing_job else None)
+        yield backend_class
+    finally:
+        backend_class.lock.release()
+
+
+@server.route('/upload', methods=['POST'])
+def upload_rvtools():
+    """
+    Route receiving an rvtools as the raw body of the request or as the "file" field of a form, e.g.
+    curl --data-binary @rvtools.xlsx -H "X-Filename: rvtools.xlsx" http://localhost:8050/upload
+    The body is streamed to a temporary file that the loaders read directly, the parsed sheets go to the workbook cache
+    and the answer holds the url opening them in the dashboard, or an error if they could not be cached.
+    """
+    # the form is only parsed for multipart requests, parsing any other body (e.g. the form content type curl sends by
+    # default) would consume the stream
+    if request.mimetype == 'multipart/form-data' and 'file' in request.files:
+        stream, filename = request.files['file'].stream, request.files['file'].filename
     else:
-        return ['', '']
+        stream, filename = request.stream, request.headers.get('X-Filename', 'rvtools.xlsx')
+
+    file, digest = spool_stream(stream)
+    try:
+        backend_class = Backend()
+        backend_class.load_source(file, digest)
+    except Exception as error:
+        # not an rvtools: not a workbook, missing sheets or columns
+        return jsonify(error='{}: {}'.format(type(error).__name__, error)), 400
+    finally:
+        file.close()
+
+    # the dashboard opens the rvtools from the workbook cache, which is disabled without pyarrow and skips the workbooks
+    # it cannot store
+    if backend_class.workbook_cache is None or not backend_class.workbook_cache.contains(backend_class.content_hash):
+        return jsonify(error='the rvtools could not be stored on the server, please upload it from the dashboard'), 500
 
+    return jsonify(hash=backend_class.content_hash, filename=filename,
+                   url=request.host_url + '?' + urlencode({'upload': backend_class.content_hash, 'filename': filename}))
+
+
+@app.callback(Output('loading_job', 'data'),
+              [Input('upload-data', 'contents'),
+               Input('url', 'search')],
+              [State('upload-data', 'filename'),
+               State('session_id', 'data')])
+def update_output1(contents, search, filename, session_id):
+    query = parse_qs((search or '').lstrip('?'))
+    if contents is None and 'upload' not in query:
+        return None
+
+    # initiate backend class
+    backend_class = sessions.get(session_id)
 
-@app.callback(Output('sizer_info', 'children'),
+    def load(progress):
+        # the rvtools are parsed in a background job, several rvtools in worker processes
+        if contents is not None:
+            backend_class.contents, backend_class.filename = contents, filename
+            backend_class.open_rvtools()
+        else:
+            # rvtools sent to the /upload route
+            backend_class.filename = query.get('filename', ['rvtools'])[0]
+            if not backend_class.restore(query['upload'][0]):
+                raise ValueError('the rvtools is no longer on the server, please upload it again')
+
+        # only the folders and clusters are sent, the VM names are searched as the user types
+        return {'hash': backend_class.content_hash, 'filename': backend_class.filename,
+                'folders': backend_class.group_values('Folder'), 'clusters': backend_class.group_values('Cluster')}
+
+    return {'id': jobs.submit(load, lock=backend_class.lock)}
+
+
+@app.callback([Output('file_name', 'children'),
+               Output('out_vm_folder', 'options'),
+               Output('out_vm_cluster', 'options'),
+               Output('upload_state', 'data'),
+               Output('load_poll', 'disabled')],
+              [Input('loading_job', 'data'),
+               Input('load_poll', 'n_intervals')])
+def poll_loading_job(loading_job, n_intervals):
+    # called when an upload is submitted, then every interval until the rvtools is parsed
+    if not loading_job:
+        return ['', [], [], None, True]
+
+    job = jobs.get(loading_job.get('id'))
+
+    if job is None:
+        # evicted, or its worker is gone: the polling goes on in case the job shows up
+        return ['The upload is unknown to the server, please upload again.', [], [], None, False]
+
+    if job['status'] == FAILED:
+        return ['The upload failed: ' + job['error'], [], [], None, True]
+
+    if job['status'] != DONE:
+        return ['Loading the rvtools...', dash.no_update, dash.no_update, dash.no_update, False]
+
+    result = job['result']
+    out_folder, out_cluster = [
+        [{'label': '{} ({} VM(s))'.format(value, count), 'value': value} for value, count in result[groups]]
+        for groups in ('folders', 'clusters')
+    ]
+    filename = result['filename']
+    return [filename if isinstance(filename, str) else ', '.join(filename), out_folder, out_cluster,
+            {'hash': result['hash'], 'filename': filename}, True]
+
+
+@app.callback(Output('out_vm', 'options'),
+              Input('out_vm', 'search_value'),
+              [State('out_vm', 'value'),
+               State('session_id', 'data'),
+               State('upload_state', 'data')])
+def search_vm_options(search_value, out_vms, session_id, upload_state):
+    with session_backend(session_id, upload_state) as backend_class:
+        matches = backend_class.search_vms(search_value)
+
+    # the VMs already picked stay in the options or the dropdown would drop them
+    out_vms = out_vms or []
+    matches = [vm for vm in matches if vm not in out_vms]
+
+    return [{'label': vm, 'value': vm} for vm in out_vms + matches]
+
+
+@app.callback(Output('out_vm_count', 'children'),
+              [Input('out_vm', 'value'),
+               Input('out_vm_pattern', 'value'),
+               Input('out_vm_folder', 'value'),
+               Input('out_vm_cluster', 'value')],
+              [State('session_id', 'data'),
+               State('upload_state', 'data')])
+def count_removed_vms(out_vms, pattern, folders, clusters, session_id, upload_state):
+    with session_backend(session_id, upload_state) as backend_class:
+        removed_vms = backend_class.select_vms(out_vms, pattern, {'Folder': folders, 'Cluster': clusters})
+
+    return '{} VM(s) removed'.format(len(removed_vms)) if removed_vms else ''
+
+
+@app.callback(Output('sizing_job', 'data'),
               Input('submit_button', 'n_clicks'),
               [State('exclude_vm', 'value'),
-               State('out_vm', 'value')])
-def give_sizing_info(n_clicks, exclude_vm, out_vms):
-    if backend_class.contents is not None:
-        backend_class.pow_off = exclude_vm
-        backend_class.removed_vms_provisioned, backend_class.removed_vms_consumed, \
-        backend_class.removed_vms_used = [out_vms] * 3
+               State('out_vm', 'value'),
+               State('out_vm_pattern', 'value'),
+               State('out_vm_folder', 'value'),
+               State('out_vm_cluster', 'value'),
+               State('session_id', 'data'),
+               State('upload_state', 'data')])
+def give_sizing_info(n_clicks, exclude_vm, out_vms, pattern, folders, clusters, session_id, upload_state):
+    if not upload_state:
+        return None
+
+    # the values of the parameters are kept with the job so any worker can rebuild the scopes they were sized on, the
+    # removed VMs are selected in the job since a previous job of the session may still hold the backend
+    options = {'exclude_vm': list(exclude_vm or []), 'out_vms': list(out_vms or []), 'pattern': pattern or '',
+               'folders': list(folders or []), 'clusters': list(clusters or [])}
+    backend_class = sessions.get(session_id)
+
+    def size(progress):
+        sync_backend(backend_class, upload_state, options)
+        if backend_class.vinfo is None:
+            raise ValueError('the rvtools is no longer on the server, please upload it again')
+
+        return backend_class.get_sizer_info(progress)
+
+    return {'id': jobs.submit(size, lock=backend_class.lock), 'options': options}
+
+
+@app.callback([Output('sizer_info', 'children'),
+               Output('job_status', 'children'),
+               Output('job_poll', 'disabled')],
+              [Input('sizing_job', 'data'),
+               Input('job_poll', 'n_intervals')],
+              [State('session_id', 'data'),
+               State('upload_state', 'data')])
+def poll_sizing_job(sizing_job, n_intervals, session_id, upload_state):
+    # called when a job is submitted, then every interval until the job is finished
+    if not sizing_job:
+        return [dash.no_update, '', True]
+
+    job = jobs.get(sizing_job.get('id'))
+
+    if job is None:
+        # evicted, or its worker is gone: the polling goes on in case the job shows up
+        return [dash.no_update, dbc.Alert('The sizing job is unknown to the server, please submit again.',
+                                          color='warning'), False]
+
+    if job['status'] == DONE:
+        # the job may have run in another worker, whose result is displayed on the scopes of its options
+        try:
+            with session_backend(session_id, upload_state, sizing_job) as backend_class:
+                return [backend_class.sizing_layout(job['result']), '', True]
+        except SessionBusy:
+            # a newer job of the session holds the backend, the polling goes on until it is free
+            return [dash.no_update, dash.no_update, False]
+
+    if job['status'] == FAILED:
+        return [dash.no_update, dbc.Alert('The sizing failed: ' + job['error'], color='danger'), True]
+
+    return [dash.no_update,
+            dbc.Progress(JOB_STAGES.get(job['status'], job['status']), value=job['progress'], striped=True,
+                         animated=True),
+            False]
+
+
+@app.callback(Output('scope_content', 'children'),
+              Input('scope_tabs', 'value'),
+              [State('session_id', 'data'),
+               State('upload_state', 'data'),
+               State('sizing_job', 'data')])
+def render_scope_tab(scope, session_id, upload_state, sizing_job):
+    # only the selected scope is rendered, each one once per submit
+    job = jobs.get(sizing_job.get('id')) if sizing_job else None
+
+    try:
+        with session_backend(session_id, upload_state, sizing_job) as backend_class:
+            # the job may have run in another worker
+            if job is not None and job['status'] == DONE:
+                backend_class.set_sizer_responses(job['result'])
+
+            return backend_class.scope_layout(scope)
+    except SessionBusy:
+        return dbc.Alert('A job of this session is running, please select the scope again once it is done.',
+                         color='info')
+
+
+# id of the rvtools tables of a scope (see Backend.create_rvtools_table)
+RVTOOLS_TABLE = {'type': 'rvtools-table', 'scope': MATCH, 'sheet': MATCH, 'removed': MATCH}
+
 
-        return backend_class.get_sizer_info()
+@app.callback([Output(RVTOOLS_TABLE, 'data'),
+               Output(RVTOOLS_TABLE, 'page_count')],
+              [Input(RVTOOLS_TABLE, 'page_current'),
+               Input(RVTOOLS_TABLE, 'page_size'),
+               Input(RVTOOLS_TABLE, 'sort_by'),
+               Input(RVTOOLS_TABLE, 'filter_query')],
+              [State('session_id', 'data'),
+               State('upload_state', 'data'),
+               State('sizing_job', 'data')])
+def update_rvtools_table(page_current, page_size, sort_by, filter_query, session_id, upload_state, sizing_job):
+    # only the visible page of the table is sent to the browser
+    table_id = dash.callback_context.outputs_list[0]['id']
+    with session_backend(session_id, upload_state, sizing_job) as backend_class:
+        data, page_count = backend_class.table_page(table_id['scope'], table_id['sheet'], table_id['removed'],
+                                                    page_current, page_size, sort_by, filter_query)
+    return [data, page_count]
 
 
-app.run_server(debug=False)
+if __name__ == '__main__':
+    app.run_server(debug=False)
@@ -0,0 +1,240 @@
+# import packages
+import argparse
+import base64
+import json
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+# sizing logic and dashboard backend
+from core import SizingCore
+from local_sizer import LocalSizer
+from sizer import RECOMMENDATION_PATH, SizerClient
+from utils import Backend
+
+# stages timed by the benchmark, in order
+STAGES = ("open_rvtools", "vinfo_summary", "create_rvtools_table", "get_sizer_info")
+
+
+def generate_rvtools(path, vms, partitions=2, powered_off=0.2, vcenters=1, seed=0):
+    """
+    Function writing a synthetic rvtools with the sheets and columns read by the sizer.
+
+    :param path: string
+    Path of the workbook written.
+
+    :param vms: int
+    Number of VMs.
+
+    :param partitions: int
+    Average number of vPartition rows of a powered on VM, the powered off VMs have none.
+
+    :param powered_off: float
+    Share of the VMs powered off.
+
+    :param vcenters: int
+    Number of vCenters the VMs are spread over ("VI SDK Server" column).
+
+    :param seed: int
+    Seed of the random values.
+    """
+    # openpyxl is only needed to write the workbooks
+    from openpyxl import Workbook
+
+    rng = np.random.default_rng(seed)
+    names = ["vm-{}-{:06d}".format(seed, index) for index in range(vms)]
+    states = np.where(rng.random(vms) < powered_off, "poweredOff", "poweredOn")
+    cpus = rng.choice([1, 2, 4, 8, 16, 32], vms, p=[0.15, 0.35, 0.3, 0.12, 0.06, 0.02])
+    memory = cpus * rng.choice([1024, 2048, 4096, 8192], vms)
+    provisioned = rng.lognormal(11, 1, vms)
+    in_use = provisioned * rng.uniform(0.1, 0.9, vms)
+    folders = rng.integers(0, max(vms // 50, 1), vms)
+    clusters = rng.integers(0, max(vms // 500, 1), vms)
+    servers = rng.integers(0, vcenters, vms)
+
+    workbook = Workbook(write_only=True)
+
+    sheet = workbook.create_sheet("vInfo")
+    sheet.append(["VM", "Powerstate", "Template", "CPUs", "Memory", "Provisioned MB", "In Use MB", "Folder", "Cluster",
+                  "VI SDK Server", "VM UUID"])
+    for index in range(vms):
+        sheet.append([names[index], states[index], False, int(cpus[index]), int(memory[index]),
+                      float(provisioned[index]), float(in_use[index]), "folder-{}".format(folders[index]),
+                      "cluster-{}".format(clusters[index]), "vcenter-{}.local".format(servers[index]),
+                      "uuid-{}-{}".format(seed, index)])
+
+    # the partitions of a VM share its used storage
+    sheet = workbook.create_sheet("vPartition")
+    sheet.append(["VM", "Powerstate", "Disk", "Capacity MB", "Consumed MB"])
+    counts = np.where(states == "poweredOn", rng.poisson(max(partitions - 1, 0), vms) + 1, 0)
+    for index in np.flatnonzero(counts):
+        for disk in range(counts[index]):
+            sheet.append([names[index], states[index], "/disk{}".format(disk),
+                          float(provisioned[index] / counts[index]), float(in_use[index] / counts[index])])
+
+    sheet = workbook.create_sheet("vMemory")
+    sheet.append(["VM", "Powerstate", "Size MB", "Consumed"])
+    consumed = memory * rng.uniform(0.05, 0.8, vms)
+    for index in range(vms):
+        sheet.append([names[index], states[index], int(memory[index]), float(consumed[index])])
+
+    workbook.save(path)
+
+
+class StubSizerHandler(BaseHTTPRequestHandler):
+    """
+    Handler answering the recommendation requests with the offline sizing engine, standing in for the VMC sizer.
+    """
+
+    sizer = LocalSizer()
+
+    def do_POST(self):
+        if not self.path.startswith(RECOMMENDATION_PATH):
+            self.send_error(404)
+            return
+
+        post = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        body = json.dumps({"genericResponse": self.sizer.recommendation(post)}).encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_sizer(port=0):
+    """
+    Function starting the stub sizer in a background thread.
+
+    :param port: int
+    Port of the server, 0 for any free port.
+
+    :return: ThreadingHTTPServer
+    The server, its url is "http://127.0.0.1:<server.server_port>".
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubSizerHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server
+
+
+def run_stages(path, streaming=False, trace=False):
+    """
+    Function running the stages of the dashboard on an rvtools, the workbook cache disabled.
+
+    :param path: string
+    Path of the rvtools.
+
+    :param streaming: bool
+    If True the rvtools is streamed (see SizingCore.streaming).
+
+    :param trace: bool
+    If True the peak of the memory allocated by python during each stage is measured instead of its time, tracing the
+    allocations slows the stages down too much to time them at the same run.
+
+    :return: dict
+    Dictionary of stage to its time in seconds, or to its peak memory in MiB.
+    """
+    backend = Backend()
+    backend.workbook_cache = None
+    backend.streaming = streaming
+    backend.pow_off = ["yes"]
+    with open(path, "rb") as file:
+        backend.contents = "data:application/octet-stream;base64," + base64.b64encode(file.read()).decode()
+    backend.filename = os.path.basename(path)
+
+    stages = {
+        "open_rvtools": backend.open_rvtools,
+        "vinfo_summary": backend.vinfo_summary,
+        "create_rvtools_table": lambda: backend.create_rvtools_table("Provisioned Scope RvTools", "provisioned"),
+        "get_sizer_info": backend.get_sizer_info
+    }
+
+    measures = dict()
+    for stage in STAGES:
+        if trace:
+            tracemalloc.start()
+            try:
+                stages[stage]()
+                measures[stage] = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+            finally:
+                tracemalloc.stop()
+        else:
+            start = time.perf_counter()
+            stages[stage]()
+            measures[stage] = time.perf_counter() - start
+
+    return measures
+
+
+def benchmark_workbook(path, streaming=False):
+    """
+    Function timing the stages of the dashboard on an rvtools, then measuring their peak memory in a second run.
+
+    :param path: string
+    Path of the rvtools.
+
+    :param streaming: bool
+    If True the rvtools is streamed (see SizingCore.streaming).
+
+    :return: list of dict
+    One row per stage with its time and peak memory.
+    """
+    seconds = run_stages(path, streaming)
+    peaks = run_stages(path, streaming, trace=True)
+
+    return [{"stage": stage, "seconds": round(seconds[stage], 4), "peak MiB": round(peaks[stage], 2)}
+            for stage in STAGES]
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Time the stages of the dashboard on synthetic rvtools.")
+    parser.add_argument("--vms", type=int, nargs="+", default=[1000, 10000, 100000], help="VM counts benchmarked")
+    parser.add_argument("--partitions", type=float, default=2, help="average vPartition rows per powered on VM")
+    parser.add_argument("--powered-off", type=float, default=0.2, help="share of the VMs powered off")
+    parser.add_argument("--streaming", action="store_true", help="stream the rvtools (bounded memory)")
+    parser.add_argument("--directory", default=None, help="directory of the generated rvtools, kept between runs")
+    parser.add_argument("-o", "--output", default=None, help="results table (.csv)")
+    args = parser.parse_args(args)
+
+    # the sizer calls go to a local stand-in so the timings do not depend on the network
+    server = start_stub_sizer()
+    SizingCore.sizer_client = SizerClient(base_url="http://127.0.0.1:{}".format(server.server_port))
+
+    directory = args.directory or tempfile.mkdtemp(prefix="auto_sizer_benchmark-")
+    os.makedirs(directory, exist_ok=True)
+
+    rows = list()
+    try:
+        for vms in args.vms:
+            path = os.path.join(directory, "rvtools_{}_{}_{}.xlsx".format(vms, args.partitions, args.powered_off))
+            if not os.path.exists(path):
+                start = time.perf_counter()
+                generate_rvtools(path, vms, args.partitions, args.powered_off)
+                print("generated {} VMs in {:.1f} s".format(vms, time.perf_counter() - start))
+
+            for row in benchmark_workbook(path, args.streaming):
+                row.update({"VMs": vms, "file MiB": round(os.path.getsize(path) / 1024 ** 2, 2)})
+                rows.append(row)
+    finally:
+        server.shutdown()
+
+    results = pd.DataFrame(rows)[["VMs", "file MiB", "stage", "seconds", "peak MiB"]]
+    print(results.to_string(index=False))
+
+    if args.output:
+        results.to_csv(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# import packages
+import argparse
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+# sizing logic, without dash
+from core import SCOPES, SizingCore
+from local_sizer import LocalSizer
+
+# columns of the results table taken from the scope values and from the sizer response
+VALUE_COLUMNS = ["VM(s)", "CPU(s)", "RAM GiB", "Storage GiB", "rcpu", "rram", "rsto", "VM poweredOff"]
+
+
+def use_local_sizer():
+    """
+    Function making the worker processes size with the offline engine.
+    """
+    SizingCore.sizer_client = LocalSizer()
+
+
+def size_workbook(path, pow_off, removed_vms, streaming, profile_buckets=3):
+    """
+    Function sizing the three scopes of one rvtools, run in a worker process.
+
+    :param path: string
+    Path of the rvtools.
+
+    :param pow_off: list
+    ["yes"] to exclude the powered off VMs, like the dashboard checklist.
+
+    :param removed_vms: list of strings
+    Names of the VMs removed from every scope.
+
+    :param streaming: bool
+    If True the rvtools is streamed (see SizingCore.streaming).
+
+    :param profile_buckets: int
+    Number of quantile buckets per dimension of the workload profiles (see SizingCore.profile_buckets).
+
+    :return: list of dict
+    One row per scope, or a single row with the error if the rvtools could not be sized.
+    """
+    file_name = os.path.basename(path)
+
+    try:
+        backend = SizingCore()
+        backend.streaming = streaming
+        backend.profile_buckets = profile_buckets
+        backend.load_path(path)
+
+        backend.pow_off = pow_off
+        backend.removed_vms_provisioned, backend.removed_vms_used, backend.removed_vms_consumed = [removed_vms] * 3
+        responses = backend.size_scopes()
+    except Exception as error:
+        return [{"file": file_name, "error": "{}: {}".format(type(error).__name__, error)}]
+
+    rows = list()
+    for scope in SCOPES:
+        values = getattr(backend, "value_dict_" + scope)
+        sddc = responses[scope]['sddcInformation']
+
+        row = {"file": file_name, "scope": scope}
+        row.update({column: values[column] for column in VALUE_COLUMNS})
+        row["Workload Profiles"] = len(backend.scope_profiles[scope])
+        row.update({"Host Count": sddc['nodesSize'],
+                    "Total Cores": sddc['provisionedCores'],
+                    "Total Memory": sddc['provisionedMemory']['value'],
+                    "Total Storage": sddc['provisionedStorage']['value'],
+                    "FTT & FTM": sddc['fttAndftm'],
+                    "error": None})
+        rows.append(row)
+
+    return rows
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Size every rvtools of a directory and write the results table.")
+    parser.add_argument("directory", help="directory of the rvtools (.xlsx)")
+    parser.add_argument("-o", "--output", default="sizing_results.csv", help="results table (.csv or .xlsx)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--keep-powered-off", action="store_true", help="keep the powered off VMs in scope")
+    parser.add_argument("--remove-vm", action="append", default=[], help="name of a VM removed from every scope")
+    parser.add_argument("--streaming", action="store_true", help="stream the rvtools (bounded memory)")
+    parser.add_argument("--profile-buckets", type=int, default=3,
+                        help="quantile buckets per dimension of the workload profiles, 1 for a single averaged profile")
+    parser.add_argument("--local", action="store_true", help="size with the offline engine instead of the VMC sizer")
+    args = parser.parse_args(args)
+
+    paths = sorted(glob.glob(os.path.join(args.directory, "*.xlsx")))
+    if not paths:
+        parser.error("no .xlsx file in {}".format(args.directory))
+
+    pow_off = [] if args.keep_powered_off else ["yes"]
+
+    # one rvtools per task, each worker keeps its own sizer connection pool
+    with ProcessPoolExecutor(max_workers=args.workers,
+                             initializer=use_local_sizer if args.local else None) as executor:
+        futures = [executor.submit(size_workbook, path, pow_off, args.remove_vm, args.streaming,
+                                   args.profile_buckets) for path in paths]
+        rows = [row for future in futures for row in future.result()]
+
+    results = pd.DataFrame(rows)
+    if args.output.endswith(".xlsx"):
+        results.to_excel(args.output, index=False)
+    else:
+        results.to_csv(args.output, index=False)
+
+    failed = results["error"].notna().sum()
+    print("{} rvtools sized, {} failed, results written to {}".format(len(paths) - failed, failed, args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1060 @@
+# import packages
+import hashlib
+import math
+import multiprocessing
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# API
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from sizer import ResponseCache, SizerClient, WorkloadProfile, build_post
+from local_sizer import LocalSizer
+from right_sizing import workload_profiles
+
+# rvtools loading
+from rvtools import (PARQUET_AVAILABLE, RVTOOLS_SHEETS, SCHEMA_VERSION, WorkbookCache, content_hash, merge_workbooks,
+                     read_rvtools, spool_contents, stream_rvtools, tag_vcenter)
+
+# display
+from tables import table_page
+from vm_search import SEARCH_LIMIT, VmIndex, split_patterns
+
+# sizing scopes, each one with its own list of removed VMs
+SCOPES = ("provisioned", "used", "consumed")
+
+# columns of vInfo grouping the VMs that can be removed together (read when the rvtools has them)
+GROUP_COLUMNS = ("Folder", "Cluster")
+
+# columns of the per VM facts (see build_vm_facts) and the sheet column summed into each of them, None to count the rows
+FACT_SOURCES = {
+    "vInfo": (("VM(s)", None), ("CPUs", "CPUs"), ("Memory", "Memory"), ("Provisioned MB", "Provisioned MB"),
+              ("In Use MB", "In Use MB")),
+    "vMemory": (("Consumed", "Consumed"),),
+    "vPartition": (("Consumed MB", "Consumed MB"),)
+}
+FACT_COLUMNS = [column for sources in FACT_SOURCES.values() for column, source in sources]
+
+# workbook cache keys produced by SizingCore.cache_key and SizingCore.load_paths, the keys sent back by the browser are
+# checked against it before they reach the cache
+CACHE_KEY_PATTERN = re.compile(r"(?:[0-9a-f]{64}-(?:stream|projected|full)-[0-9a-f]{8}|merged-[0-9a-f]{64})\Z")
+
+# rows of the sizing metrics and sizer metrics tables, columns of the workload profiles table
+VALUES_UNITS = ['VM(s)', 'CPU(s)', 'RAM (GiB)', 'Storage (Gib)']
+PROFILE_COLUMNS = ['Profile', 'VM(s)', 'vCPU(s) per VM', 'RAM (GiB) per VM', 'Storage (GiB) per VM']
+SIZED_UNITS = ['I3 Host Count', 'Total Cores', 'Total Memory', 'Total Storage', 'FTT & FTM']
+
+
+def vm_mask(frame, vms):
+    """
+    Function flagging the rows of a sheet whose VM is in a set of names.
+    The VM column is categorical so the names are only compared once per distinct VM, the rows just look up their code.
+
+    :param frame: DataFrame
+    Sheet with a categorical "VM" column.
+
+    :param vms: set of strings
+    The names of the VMs to flag.
+
+    :return: numpy array of bool
+    True for the rows of the VMs in vms.
+    """
+    vm = frame['VM']
+    if not vms:
+        return np.zeros(len(vm), dtype=bool)
+
+    # extra False at the end for the code -1 of empty cells
+    flags = np.append(vm.cat.categories.isin(list(vms)), False)
+
+    return flags[vm.cat.codes.values]
+
+
+def scope_values(vms, cpus, ram, storage, vm_off):
+    """
+    Function formatting the totals of a scope into the dictionary displayed on the dashboard and sent to the sizer.
+
+    :param vms: int
+    Number of VMs in scope.
+
+    :param cpus: int
+    Total number of vCPUs.
+
+    :param ram: float
+    Total RAM in GiB.
+
+    :param storage: float
+    Total storage in GiB.
+
+    :param vm_off: int
+    Number of VMs powered off in the rvtools.
+
+    :return: dict
+    """
+    return {"VM(s)": vms,
+            "CPU(s)": cpus,
+            "RAM GiB": ram,
+            "Storage GiB": storage,
+            "rcpu": math.ceil(cpus / vms) if vms else 0,
+            "rram": math.ceil(ram / vms) if vms else 0,
+            "rsto": math.ceil(storage / vms) if vms else 0,
+            "VM poweredOff": vm_off}
+
+
+def summarize_scope(totals, scope, powered_off_sto, vm_off):
+    """
+    Function formatting the running totals of a scope into its scope_values.
+
+    :param totals: Series
+    The summed contributions of the VMs kept in the scope (see vm_contributions).
+
+    :param scope: string
+    One of SCOPES.
+
+    :param powered_off_sto: float
+    The In Use MB of the powered off VMs kept.
+
+    :param vm_off: int
+    Number of VMs powered off in the rvtools.
+
+    :return: dict
+    """
+    if scope == "provisioned":
+        ram, storage = totals["Memory"], totals["Provisioned MB"]
+    elif scope == "used":
+        ram, storage = totals["Consumed"], totals["In Use MB"]
+    else:
+        # add In Use for VMs that dont have VM Tools (not in vPartition) and for the powered off VMs kept
+        ram, storage = totals["Consumed"], totals["Consumed MB"] + powered_off_sto + totals["No Tools In Use MB"]
+
+    return scope_values(int(round(totals["VM(s)"])), int(round(totals["CPUs"])), ram / 1024, storage / 1024, vm_off)
+
+
+def per_vm_sum(codes, values, size):
+    """
+    Function summing the rows of a sheet per VM key.
+
+    :param codes: numpy array of int
+    The VM key of each row, -1 for the rows without VM.
+
+    :param values: numpy array
+    The values to sum.
+
+    :param size: int
+    The number of VM keys.
+
+    :return: numpy array of float
+    The sum of each VM key.
+    """
+    keep = codes >= 0
+
+    return np.bincount(codes[keep], weights=np.asarray(values, dtype=np.float64)[keep], minlength=size)
+
+
+def build_vm_facts(vinfo, vmemory, vpartition):
+    """
+    Function joining vInfo, vMemory and vPartition into a single table with one row per VM name.
+    The three sheets are keyed on the same categorical VM codes, so each column is a single bincount over the rows of
+    its sheet instead of a lookup of the names. Every column is summed over all the rows of the VM and, prefixed with
+    "poweredOn ", over its powered on rows only.
+
+    :param vinfo: DataFrame
+    :param vmemory: DataFrame
+    :param vpartition: DataFrame
+    The sheets with their categorical "VM" and "Powerstate" columns (see rvtools.RVTOOLS_SCHEMA).
+
+    :return: DataFrame
+    Indexed by VM name, with the FACT_COLUMNS, their "poweredOn " counterparts and "In vPartition".
+    """
+    sheets = (("vInfo", vinfo), ("vMemory", vmemory), ("vPartition", vpartition))
+
+    # VM names of the three sheets, each sheet recoded to them
+    names = vinfo["VM"].cat.categories.union(vmemory["VM"].cat.categories).union(vpartition["VM"].cat.categories)
+    codes = {sheet: frame["VM"].cat.set_categories(names).cat.codes.values.astype(np.int64)
+             for sheet, frame in sheets}
+    powered_on = {sheet: (frame["Powerstate"] != "poweredOff").values for sheet, frame in sheets}
+
+    facts = dict()
+    for sheet, frame in sheets:
+        for column, source in FACT_SOURCES[sheet]:
+            values = np.ones(len(frame)) if source is None else frame[source].values
+            facts[column] = per_vm_sum(codes[sheet], values, len(names))
+            facts["poweredOn " + column] = per_vm_sum(codes[sheet], np.where(powered_on[sheet], values, 0),
+                                                      len(names))
+
+    facts["In vPartition"] = np.bincount(codes["vPartition"][codes["vPartition"] >= 0], minlength=len(names)) > 0
+
+    return pd.DataFrame(facts, index=pd.Index(names.astype(object), name="VM"))
+
+
+def vm_contributions(facts, exclude_off):
+    """
+    Function computing what each VM adds to the totals of the scopes, before removing VMs by name.
+
+    :param facts: DataFrame
+    The per VM facts of the rvtools (see build_vm_facts).
+
+    :param exclude_off: bool
+    If True the powered off VMs are left out.
+
+    :return: (DataFrame, float)
+    The contributions, indexed by VM name, and the In Use MB of the powered off VMs kept (counted in the consumed
+    storage as they do not appear in vPartition).
+    """
+    if exclude_off:
+        contributions = facts[["poweredOn " + column for column in FACT_COLUMNS]].set_axis(FACT_COLUMNS, axis=1)
+        powered_off_sto = 0
+    else:
+        contributions = facts[FACT_COLUMNS].copy()
+        # todo: make sure they dont actually exist in vPartition already
+        powered_off_sto = facts["In Use MB"].sum() - facts["poweredOn In Use MB"].sum()
+
+    # VMs without VM Tools (not in vPartition)
+    contributions["No Tools In Use MB"] = np.where(facts["In vPartition"].values, 0, contributions["In Use MB"].values)
+
+    return contributions, powered_off_sto
+
+
+def scope_demands(contributions, scope, removed_vms=(), powered_off_sto=0):
+    """
+    Function returning what each VM kept in a scope needs.
+
+    :param contributions: DataFrame
+    The contributions of the VMs (see vm_contributions).
+
+    :param scope: string
+    One of SCOPES.
+
+    :param removed_vms: iterable of strings
+    The names of the VMs removed from the scope.
+
+    :param powered_off_sto: float
+    The In Use MB of the powered off VMs kept.
+
+    :return: (numpy array, numpy array, numpy array, numpy array)
+    Number of VMs, vCPUs, RAM (GiB) and storage (GiB) of each VM name, in the columns the scope is sized on.
+    """
+    frame = contributions
+    if removed_vms:
+        frame = frame[~frame.index.isin(list(removed_vms))]
+
+    if scope == "provisioned":
+        ram, storage = frame["Memory"].values, frame["Provisioned MB"].values
+    elif scope == "used":
+        ram, storage = frame["Consumed"].values, frame["In Use MB"].values
+    else:
+        # the In Use MB of the powered off VMs kept is only known as a total, spread over the VMs
+        vms = max(frame["VM(s)"].sum(), 1)
+        ram = frame["Consumed"].values
+        storage = (frame["Consumed MB"].values + frame["No Tools In Use MB"].values +
+                   powered_off_sto * frame["VM(s)"].values / vms)
+
+    return frame["VM(s)"].values, frame["CPUs"].values, ram / 1024, storage / 1024
+
+
+def parse_workbook(source, streaming=False, project_columns=True):
+    """
+    Function parsing an rvtools, run in a worker process when several rvtools are uploaded together.
+
+    :param source: bytes, path or file-like object
+    The rvtools.
+
+    :param streaming: bool
+    :param project_columns: bool
+    The reading mode, see SizingCore.streaming and SizingCore.project_columns.
+
+    :return: (dict, dict)
+    Dictionary of sheet name to DataFrame and the load timings.
+    """
+    if streaming:
+        return stream_rvtools(source)
+
+    return read_rvtools(source, project=project_columns)
+
+
+class SizingCore:
+    """
+    Sizing logic of the dashboard backend, free of any dash import so it also runs headless (see cli.py).
+    In this section, static variables will be initiated.
+    """
+
+    # template for API POST for the sizer
+    # quick: built for each call from immutable profiles (see sizer.WorkloadProfile and sizer.build_post)
+
+    # manual
+    # todo
+
+    # sizer answering the requests, shared by all the sessions: the VMC sizer API (with its connection pool and response
+    # cache) or the offline sizing engine when the environment variable AUTO_SIZER_BACKEND is "local"
+    # created on first use (see get_sizer_client) so importing the module stays cheap, the lock keeps the concurrent
+    # jobs from each creating one
+    sizer_client = None
+    sizer_client_lock = threading.Lock()
+
+    def __init__(self):
+        """
+        This function initiates the backend class dealing with all the sizer options.
+        The initiation happens when an Rvtools is added to the dashboard and takes the elements to read it as inputs.
+
+        -----------------------------------
+        Initialised variables:
+
+        :var - contents:  base64 encoded string
+        Parameter from the dcc.Upload object that contains the files contents.
+
+        :var - filename: string
+        The name of the file(s) that was(were) uploaded. Note that this does not include the path of the file
+        (for security reasons).
+
+        #todo: rest of variables annotations
+        """
+
+        # lock held by the background jobs and the requests of the session while they read or change the backend
+        self.lock = threading.RLock()
+
+        # rvtools file information
+        self.filename, self.contents = [None] * 2
+
+        # class variables to share the opened databases (entire scope)
+        self.vinfo, self.vpartition, self.vmemory = [None] * 3
+
+        # what each VM adds to the totals of a scope (one row per VM name) and their sum over all VMs, built for
+        # the powered off option exclude_off
+        self.contributions, self.contributions_total, self.exclude_off = [None] * 3
+
+        # per VM facts of the three sheets, built once per rvtools (see build_vm_facts), and of each vCenter of a merged
+        # estate
+        self.vm_facts, self.vcenter_facts = None, None
+
+        # running totals of each scope with the removed VMs they were computed for: {scope: (frozenset, Series)}
+        self.scope_totals = dict()
+
+        # boolean masks of the rows kept before removing VMs by name (powered off VMs excluded or not), per sheet
+        self.base_masks = dict()
+
+        # boolean masks of the rows of the VMs removed by name, per sheet: {frozenset: {sheet name: numpy array}}
+        # the scoped and removed databases are only built from them for display (see scope_frames)
+        self.scope_masks = dict()
+
+        # scoped and removed databases already built: {(frozenset, removed): (vInfo, vMemory, vPartition)}
+        self.scope_frames_cache = dict()
+
+        # search index over the VM names of vInfo, built on the first search (see search_vms)
+        self.vm_index = None
+
+        # number of VMs powered off and their In Use MB (counted in consumed storage when they are kept)
+        self.vm_off, self.powered_off_sto = 0, 0
+
+        # initiate dictionary where all important values will be stored
+        self.value_dict_provisioned = dict()
+        self.value_dict_used = dict()
+        self.value_dict_consumed = dict()
+
+        # class variables to keep track of scope
+        # List of string names of VMs removed from scope
+        self.removed_vms_consumed = list()
+        self.removed_vms_provisioned = list()
+        self.removed_vms_used = list()
+
+        # Variable setting if powered off VMs should be removed
+        self.pow_off = [None]
+
+        # options of the last submit, set by set_options: {"exclude_vm": list, "removed_vms": list}
+        self.sizing_options = None
+
+        # number of quantile buckets per dimension used to right-size the VMs into workload profiles (see
+        # right_sizing.workload_profiles), 1 sizes the averaged VM of the scope as a single profile
+        self.profile_buckets = 3
+
+        # workload profiles sent to the sizer for each scope at the last sizing
+        self.scope_profiles = dict()
+
+        # workload profiles already computed on the contributions: {(scope, frozenset of removed VMs, profile_buckets):
+        # list}, a submit reusing a list of removed VMs does not filter the contributions again (see build_profiles)
+        self.profiles_cache = dict()
+
+        # load time in seconds of the last opened rvtools, per stage ("open" and each sheet name)
+        self.load_timings = dict()
+
+        # Variable setting if only the columns needed for the sizing are read from the rvtools
+        self.project_columns = True
+
+        # Variable setting if the rvtools is streamed in chunks with vPartition folded per VM (bounded memory) instead
+        # of fully loaded (needed to display the vPartition detail rows)
+        self.streaming = False
+
+        # cache of the parsed rvtools, keyed by the hash of the uploaded file (None to disable, or without pyarrow)
+        self.workbook_cache = WorkbookCache() if PARQUET_AVAILABLE else None
+        self.content_hash = None
+
+    def open_rvtools(self):
+        """
+        Function to open the rvtools fed to the upload object in the dashboard, several rvtools are merged into one
+        estate (see load_paths).
+        The files are decoded into temporary files read by the loaders, then the contents strings are released.
+        """
+        # a single file is a string, several files a list
+        contents = [self.contents] if isinstance(self.contents, str) else list(self.contents)
+
+        if len(contents) == 1:
+            file, digest = spool_contents(contents[0])
+            try:
+                self.load_source(file, digest)
+            finally:
+                file.close()
+                self.contents = None
+            return
+
+        names = [self.filename] if isinstance(self.filename, str) else list(self.filename or [])
+        names += ["rvtools {}".format(index + 1) for index in range(len(names), len(contents))]
+
+        # the worker processes open the files by path
+        files = list()
+        try:
+            for item in contents:
+                files.append(spool_contents(item, named=True))
+                files[-1][0].close()
+            self.load_paths([file.name for file, digest in files], [digest for file, digest in files], names)
+        finally:
+            for file, digest in files:
+                os.remove(file.name)
+            self.contents = None
+
+    def load_path(self, path, chunk_size=1024 ** 2):
+        """
+        Function to open an rvtools from its path, read by the loaders without a copy in memory.
+
+        :param path: string
+        The path of the rvtools.
+
+        :param chunk_size: int
+        The number of bytes hashed at a time.
+        """
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            for block in iter(lambda: file.read(chunk_size), b""):
+                digest.update(block)
+
+        self.load_source(path, digest.hexdigest())
+
+    def cache_key(self, digest):
+        """
+        Function returning the workbook cache key of an rvtools: the parsed sheets depend on the reading mode and the
+        schemas as well as on the file.
+
+        :param digest: string
+        The sha256 digest of the file.
+
+        :return: string
+        """
+        mode = "stream" if self.streaming else ("projected" if self.project_columns else "full")
+
+        return "{}-{}-{}".format(digest, mode, SCHEMA_VERSION)
+
+    def load_source(self, source, digest):
+        """
+        Function to open an rvtools from its bytes, a path or a file object, parsed once and cached.
+
+        :param source: bytes, path or file-like object
+        The rvtools, read directly by the loaders.
+
+        :param digest: string
+        The sha256 digest of the file (see rvtools.content_hash).
+        """
+        self.content_hash = self.cache_key(digest)
+
+        frames = None
+        if self.workbook_cache is not None:
+            start = time.perf_counter()
+            frames = self.workbook_cache.get(self.content_hash)
+            self.load_timings = {"cache": time.perf_counter() - start}
+
+        if frames is None:
+            # parse the workbook once for all the sheets
+            frames, self.load_timings = parse_workbook(source, self.streaming, self.project_columns)
+
+            if self.workbook_cache is not None:
+                self.workbook_cache.put(self.content_hash, frames)
+
+        self.set_sheets(frames)
+
+    def load_paths(self, paths, digests, names):
+        """
+        Function to open the rvtools of several vCenters as a single estate.
+        The rvtools not in the workbook cache are parsed in parallel, one worker process each, then merged: every row is
+        tagged with its vCenter and the VMs exported twice are only kept once (see rvtools.merge_workbooks).
+
+        :param paths: list of strings
+        The paths of the rvtools.
+
+        :param digests: list of strings
+        The sha256 digest of each file.
+
+        :param names: list of strings
+        The names of the files, the vCenter of the exports without "VI SDK Server" column.
+        """
+        keys = [self.cache_key(digest) for digest in digests]
+        self.content_hash = "merged-" + content_hash("|".join(keys + list(names)).encode())
+        self.filename = list(names)
+
+        cache = self.workbook_cache
+        start = time.perf_counter()
+        merged = cache.get(self.content_hash) if cache is not None else None
+
+        if merged is None:
+            workbooks = [cache.get(key) if cache is not None else None for key in keys]
+            missing = [index for index, frames in enumerate(workbooks) if frames is None]
+
+            if missing:
+                # spawned rather than forked, the web process runs threads whose locks a fork would copy held
+                with ProcessPoolExecutor(max_workers=min(len(missing), os.cpu_count() or 1),
+                                         mp_context=multiprocessing.get_context("spawn")) as executor:
+                    futures = {index: executor.submit(parse_workbook, paths[index], self.streaming,
+                                                      self.project_columns)
+                               for index in missing}
+                    for index, future in futures.items():
+                        workbooks[index] = future.result()[0]
+                        if cache is not None:
+                            cache.put(keys[index], workbooks[index])
+
+            merged = merge_workbooks(workbooks, names)
+            if cache is not None:
+                cache.put(self.content_hash, merged)
+
+        self.load_timings = {"merge": time.perf_counter() - start}
+        self.set_sheets(merged)
+
+        # the per vCenter facts are joined with the load rather than at the first submit
+        self.get_vcenter_facts()
+
+    def set_sheets(self, frames):
+        """
+        Function setting the opened databases and discarding the results computed on the previous ones.
+
+        :param frames: dict
+        Dictionary of sheet name to DataFrame.
+        """
+        # the rows of a single rvtools are tagged with their vCenter when opened, merged rvtools already are
+        if "vCenter" not in frames["vInfo"].columns:
+            # the dashboard upload gives a list of file names, even for a single rvtools
+            names = [self.filename] if isinstance(self.filename, str) else list(self.filename or [])
+            frames = tag_vcenter(frames, names[0] if len(names) == 1 and names[0] else "rvtools")
+
+        self.vinfo, self.vpartition, self.vmemory = frames["vInfo"], frames["vPartition"], frames["vMemory"]
+        self.contributions, self.vm_facts, self.vcenter_facts, self.vm_index = None, None, None, None
+        self.scope_totals, self.scope_masks, self.scope_frames_cache = dict(), dict(), dict()
+
+    def unload(self):
+        """
+        Function discarding the opened databases and the results computed on them, e.g. when the session moved to an
+        rvtools that is not in the workbook cache any more.
+        """
+        self.vinfo, self.vpartition, self.vmemory = [None] * 3
+        self.content_hash, self.sizing_options = None, None
+        self.contributions, self.vm_facts, self.vcenter_facts, self.vm_index = None, None, None, None
+        self.scope_totals, self.scope_masks, self.scope_frames_cache = dict(), dict(), dict()
+
+    def restore(self, content_hash):
+        """
+        Function loading the rvtools of a session from the workbook cache, used when the session was opened by another
+        worker or evicted from this one.
+
+        :param content_hash: string
+        The cache key of the parsed rvtools (self.content_hash after open_rvtools).
+
+        :return: bool
+        True if the rvtools was found in the cache, False for the keys not made by cache_key.
+        """
+        # the key comes from the browser
+        if not isinstance(content_hash, str) or not CACHE_KEY_PATTERN.match(content_hash):
+            return False
+
+        if self.workbook_cache is None:
+            return False
+
+        frames = self.workbook_cache.get(content_hash)
+        if frames is None or any(sheet not in frames for sheet in RVTOOLS_SHEETS):
+            return False
+
+        self.set_sheets(frames)
+        self.content_hash = content_hash
+
+        return True
+
+    def get_vm_index(self):
+        if self.vm_index is None:
+            self.vm_index = VmIndex(self.vinfo['VM'].cat.categories)
+
+        return self.vm_index
+
+    def search_vms(self, query, limit=SEARCH_LIMIT):
+        """
+        Function returning the VM names of vInfo matching the text typed in the VM picker.
+
+        :param query: string
+        The text typed, case insensitive.
+
+        :param limit: int
+        The maximum number of names returned.
+
+        :return: list of strings
+        The names starting with the query first, then the names containing it.
+        """
+        if self.vinfo is None:
+            return list()
+
+        return self.get_vm_index().search(query, limit)
+
+    def group_values(self, column):
+        """
+        Function returning the distinct values of a grouping column of vInfo (see GROUP_COLUMNS) with their VM count.
+
+        :param column: string
+        "Folder" or "Cluster".
+
+        :return: list of (string, int)
+        Empty if the rvtools has no such column.
+        """
+        if self.vinfo is None or column not in self.vinfo.columns:
+            return list()
+
+        counts = self.vinfo.groupby(column, observed=True)['VM'].nunique()
+
+        return [(str(value), int(count)) for value, count in counts.items()]
+
+    def select_vms(self, names=None, patterns=None, groups=None):
+        """
+        Function gathering the VMs removed from scope: picked by name, matching glob patterns or in folders/clusters.
+
+        :param names: list of strings
+        The names picked one by one.
+
+        :param patterns: string
+        Glob patterns separated by commas or spaces, e.g. "test-*, *-old", case insensitive.
+
+        :param groups: dict
+        Dictionary of grouping column (see GROUP_COLUMNS) to the list of its values whose VMs are removed.
+
+        :return: list of strings
+        The names of the VMs, sorted.
+        """
+        vms = set(names or ())
+        if self.vinfo is None:
+            return sorted(vms)
+
+        vms.update(self.get_vm_index().match(split_patterns(patterns)))
+
+        for column, values in (groups or {}).items():
+            if values and column in self.vinfo.columns:
+                selected = self.vinfo[column].astype(str).isin([str(value) for value in values]).values
+                vms.update(self.vinfo.loc[selected, 'VM'].dropna().astype(str))
+
+        return sorted(vms)
+
+    def set_options(self, exclude_vm, removed_vms):
+        """
+        Function setting the options of a submit, used by the next vinfo_summary.
+
+        :param exclude_vm: list of strings
+        The value of the powered off checklist, "yes" to leave the powered off VMs out.
+
+        :param removed_vms: list of strings
+        The names of the VMs removed from the three scopes (see select_vms).
+        """
+        self.sizing_options = {"exclude_vm": [str(value) for value in exclude_vm or ()],
+                               "removed_vms": [str(vm) for vm in removed_vms or ()]}
+        self.scope_profiles = dict()
+
+        self.pow_off = self.sizing_options["exclude_vm"]
+        self.removed_vms_provisioned, self.removed_vms_used, self.removed_vms_consumed = \
+            [self.sizing_options["removed_vms"]] * 3
+
+    def apply_options(self, options):
+        """
+        Function bringing the scopes to the options of a submit if they were computed for other options or not at all,
+        e.g. by a worker that restored the session from the workbook cache (see restore).
+
+        :param options: dict
+        The values of the parameters at the submit: "exclude_vm", "out_vms", "pattern", "folders" and "clusters",
+        the removed VMs are selected from them on the rvtools loaded.
+        """
+        if self.vinfo is None or not isinstance(options, dict):
+            return
+
+        removed_vms = [str(vm) for vm in self.select_vms(options.get("out_vms"), options.get("pattern"),
+                                                         {"Folder": options.get("folders"),
+                                                          "Cluster": options.get("clusters")})]
+        exclude_vm = [str(value) for value in options.get("exclude_vm") or ()]
+
+        if {"exclude_vm": exclude_vm, "removed_vms": removed_vms} != self.sizing_options or not self.scope_totals:
+            self.set_options(exclude_vm, removed_vms)
+            self.vinfo_summary()
+
+    def vinfo_summary(self):
+        """
+        Main function doing the calculations, research and preparing of datasets for display on dashboard.
+        The totals of each scope are kept between calls: when only the removed VMs change, the contributions of the VMs
+        added to or taken out of the list are applied to the previous totals instead of summing the sheets again.
+
+        :output: dict
+        Formated dictionary with all values of interest to display on dashboard
+        """
+        # per VM contributions only depend on the rvtools and on the powered off option
+        exclude_off = "yes" in (self.pow_off or ())
+        if self.contributions is None or self.exclude_off != exclude_off:
+            self.build_contributions(exclude_off)
+
+        # aggregate results for test
+        for scope in SCOPES:
+            self.update_scope_totals(scope, frozenset(getattr(self, "removed_vms_" + scope) or ()))
+            setattr(self, "value_dict_" + scope,
+                    summarize_scope(self.scope_totals[scope][1], scope, self.powered_off_sto, self.vm_off))
+
+    def get_vm_facts(self):
+        # per VM facts of the rvtools, joined once per upload
+        if self.vm_facts is None:
+            self.vm_facts = build_vm_facts(self.vinfo, self.vmemory, self.vpartition)
+
+        return self.vm_facts
+
+    def get_vcenter_facts(self):
+        """
+        Function returning the per VM facts of each vCenter of a merged estate, joined once per upload.
+
+        :return: dict
+        Dictionary of vCenter name to its facts (see build_vm_facts), empty for a single vCenter.
+        """
+        if self.vcenter_facts is None:
+            vcenters = self.vinfo["vCenter"].cat.categories
+            self.vcenter_facts = dict()
+
+            for vcenter in vcenters if len(vcenters) > 1 else ():
+                sheets = list()
+                for frame in (self.vinfo, self.vmemory, self.vpartition):
+                    frame = frame[(frame["vCenter"] == vcenter).values]
+                    sheets.append(frame.assign(VM=frame["VM"].cat.remove_unused_categories()))
+                self.vcenter_facts[vcenter] = build_vm_facts(*sheets)
+
+        return self.vcenter_facts
+
+    def build_contributions(self, exclude_off):
+        """
+        Function computing, for the VMs kept before removing VMs by name, what each VM adds to the totals of a scope.
+        Resets the running totals of the scopes.
+
+        :param exclude_off: bool
+        If True the powered off VMs are left out.
+        """
+        sheets = {"vInfo": self.vinfo, "vPartition": self.vpartition, "vMemory": self.vmemory}
+
+        facts = self.get_vm_facts()
+
+        # get number of VMs with "Powerstate" values
+        self.vm_off = int(round(facts["VM(s)"].sum() - facts["poweredOn VM(s)"].sum()))
+
+        # remove VMs not running or poweroff if necessary & if not store In Use storage to use in consumed sizing as
+        # VMs powered off dont appear in vpartition
+        # the opened databases are never modified, the VMs left out only get masked so the options can be changed and
+        # the sizing submitted again on the same rvtools
+        if exclude_off:
+            self.base_masks = {sheet: (frame["Powerstate"] != "poweredOff").values for sheet, frame in sheets.items()}
+        else:
+            self.base_masks = {sheet: np.ones(len(frame), dtype=bool) for sheet, frame in sheets.items()}
+
+        self.contributions, self.powered_off_sto = vm_contributions(facts, exclude_off)
+        self.contributions_total = self.contributions.sum()
+        self.exclude_off = exclude_off
+
+        self.scope_totals = dict()
+        self.scope_masks = dict()
+        self.scope_frames_cache = dict()
+        self.profiles_cache = dict()
+
+    def vm_totals(self, vms):
+        """
+        Function summing the contributions of a few VMs, looked up by name.
+
+        :param vms: set of strings
+        The names of the VMs.
+
+        :return: Series
+        The summed contributions, names not in the rvtools add nothing.
+        """
+        if not vms:
+            return pd.Series(0.0, index=self.contributions.columns)
+
+        return self.contributions.reindex(list(vms)).sum()
+
+    def update_scope_totals(self, scope, removed_vms):
+        """
+        Function updating the running totals of a scope to a new list of removed VMs.
+
+        :param scope: string
+        One of SCOPES.
+
+        :param removed_vms: frozenset of strings
+        The names of the VMs removed from the scope.
+        """
+        if scope not in self.scope_totals:
+            totals = self.contributions_total - self.vm_totals(removed_vms)
+        else:
+            previous_removed, totals = self.scope_totals[scope]
+            if previous_removed == removed_vms:
+                return
+            totals = totals - self.vm_totals(removed_vms - previous_removed) \
+                + self.vm_totals(previous_removed - removed_vms)
+
+        self.scope_totals[scope] = (removed_vms, totals)
+
+    def scope_frames(self, scope, removed=False):
+        """
+        Function building the databases of a scope from its masks, only needed to display them.
+
+        :param scope: string
+        One of SCOPES.
+
+        :param removed: bool
+        If True the databases of the VMs removed from the scope by name are returned instead.
+
+        :return: (DataFrame, DataFrame, DataFrame)
+        The vInfo, vMemory and vPartition of the scope.
+        """
+        # one set of masks per distinct list of removed VMs, the scopes usually share the same list
+        removed_vms = self.scope_totals[scope][0]
+        if (removed_vms, removed) in self.scope_frames_cache:
+            return self.scope_frames_cache[(removed_vms, removed)]
+
+        if removed_vms not in self.scope_masks:
+            self.scope_masks[removed_vms] = {
+                sheet: vm_mask(frame, removed_vms)
+                for sheet, frame in (("vInfo", self.vinfo), ("vMemory", self.vmemory), ("vPartition", self.vpartition))
+            }
+        flags = self.scope_masks[removed_vms]
+
+        if removed:
+            keep = {sheet: self.base_masks[sheet] & mask for sheet, mask in flags.items()}
+        else:
+            keep = {sheet: self.base_masks[sheet] & ~mask for sheet, mask in flags.items()}
+
+        frames = self.vinfo[keep["vInfo"]], self.vmemory[keep["vMemory"]], self.vpartition[keep["vPartition"]]
+        self.scope_frames_cache[(removed_vms, removed)] = frames
+
+        return frames
+
+    def table_page(self, scope, sheet, removed, page_current, page_size, sort_by=None, filter_query=None):
+        """
+        Function returning one page of a scope database, filtered and sorted on the server.
+
+        :param scope: string
+        One of SCOPES.
+
+        :param sheet: string
+        "vInfo", "vMemory" or "vPartition".
+
+        :param removed: bool
+        If True the page is taken from the VMs removed from the scope.
+
+        :return: (list of dict, int)
+        The records of the page and the number of pages, no records if the scope was not computed.
+        """
+        if scope not in self.scope_totals:
+            return [], 1
+
+        vinfo, vmemory, vpartition = self.scope_frames(scope, removed)
+        frame = {"vInfo": vinfo, "vMemory": vmemory, "vPartition": vpartition}[sheet]
+
+        return table_page(frame, page_current, page_size, sort_by, filter_query)
+
+    def get_api_response(self, values):
+        """
+        Function sizing workload profiles together.
+
+        :param values: list
+        The WorkloadProfile objects, or the number of VMs, vCPUs per VM, RAM per VM (GiB) and storage per VM (GiB) of a
+        single profile.
+
+        :return: dict
+        The "genericResponse" of the sizer.
+        """
+        # set values, a new POST is built for every call so concurrent calls never share it
+        if values and isinstance(values[0], WorkloadProfile):
+            profiles = values
+        else:
+            profiles = [WorkloadProfile(vms_num=values[0], vcpus_per_vm=values[1], vram_per_vm=values[2],
+                                        vmdk_size=values[3])]
+
+        return self.get_sizer_client().recommendation(build_post(profiles))
+
+    @classmethod
+    def get_sizer_client(cls):
+        """
+        Function returning the shared sizer, created on the first call.
+
+        :return: SizerClient or LocalSizer
+        """
+        if cls.sizer_client is None:
+            with cls.sizer_client_lock:
+                # another thread may have created it while this one waited
+                if cls.sizer_client is None:
+                    if os.environ.get("AUTO_SIZER_BACKEND") == "local":
+                        cls.sizer_client = LocalSizer()
+                    else:
+                        cls.sizer_client = SizerClient(cache=ResponseCache())
+
+        return cls.sizer_client
+
+    def get_api_responses(self, values_dict):
+        """
+        Function calling the sizer for several scenarios at once, the total wait is the one of the slowest call.
+
+        :param values_dict: dict
+        Dictionary of scenario name to the values given to get_api_response.
+
+        :return: dict
+        Dictionary of scenario name to the sizer response.
+        """
+        with ThreadPoolExecutor(max_workers=max(len(values_dict), 1)) as executor:
+            futures = {name: executor.submit(self.get_api_response, values) for name, values in values_dict.items()}
+
+            return {name: future.result() for name, future in futures.items()}
+
+    def size_scopes(self, progress=None):
+        """
+        Function computing the totals of the three scopes and sizing them.
+
+        :param progress: callable
+        Function called with the name of each stage ("summary", "sizing") and the percentage done, e.g. by a background
+        job (see jobs.JobQueue).
+
+        :return: dict
+        Dictionary of scope name to the sizer response.
+        """
+        if progress is not None:
+            progress("summary", 10)
+        self.vinfo_summary()
+
+        if progress is not None:
+            progress("sizing", 40)
+
+        # right-size the VMs of each scope into workload profiles, the three scopes are sized concurrently
+        self.scope_profiles = {scope: self.build_profiles(scope) for scope in SCOPES}
+
+        return self.get_api_responses(self.scope_profiles)
+
+    def vcenter_values(self):
+        """
+        Function computing the totals of the three scopes of each vCenter of a merged estate, with the current powered
+        off option and removed VMs, from the per VM facts of each vCenter (see get_vcenter_facts).
+
+        :return: DataFrame
+        One row per vCenter and scope with the values of scope_values, empty for a single vCenter.
+        """
+        vcenter_facts = self.get_vcenter_facts()
+        if not vcenter_facts:
+            return pd.DataFrame()
+
+        exclude_off = "yes" in (self.pow_off or ())
+
+        rows = list()
+        for vcenter, facts in vcenter_facts.items():
+            contributions, powered_off_sto = vm_contributions(facts, exclude_off)
+            vm_off = int(round(facts["VM(s)"].sum() - facts["poweredOn VM(s)"].sum()))
+            total = contributions.sum()
+
+            for scope in SCOPES:
+                removed_vms = list(getattr(self, "removed_vms_" + scope) or ())
+                totals = total - contributions.reindex(removed_vms).sum() if removed_vms else total
+
+                row = {"vCenter": vcenter, "scope": scope}
+                row.update(summarize_scope(totals, scope, powered_off_sto, vm_off))
+                rows.append(row)
+
+        return pd.DataFrame(rows)
+
+    def scope_demands(self, scope):
+        """
+        Function returning what each VM kept in a scope needs, computed by vinfo_summary.
+
+        :param scope: string
+        One of SCOPES.
+
+        :return: (numpy array, numpy array, numpy array, numpy array)
+        Number of VMs, vCPUs, RAM (GiB) and storage (GiB) of each VM name, in the columns the scope is sized on.
+        """
+        return scope_demands(self.contributions, scope, self.scope_totals[scope][0], self.powered_off_sto)
+
+    def build_profiles(self, scope):
+        """
+        Function right-sizing the VMs kept in a scope into workload profiles, computed once per list of removed VMs
+        until the contributions change.
+
+        :param scope: string
+        One of SCOPES.
+
+        :return: list of WorkloadProfile
+        """
+        key = (scope, self.scope_totals[scope][0], self.profile_buckets)
+        if key not in self.profiles_cache:
+            self.profiles_cache[key] = workload_profiles(*self.scope_demands(scope), buckets=self.profile_buckets)
+
+        return self.profiles_cache[key]
+
+    def get_scope_profiles(self, scope):
+        """
+        Function returning the workload profiles of a scope, the ones sent to the sizer at the last sizing or computed
+        again for the current options (e.g. by a worker that did not run the sizing).
+
+        :param scope: string
+        One of SCOPES.
+
+        :return: list of WorkloadProfile
+        """
+        if scope not in self.scope_profiles:
+            self.scope_profiles[scope] = self.build_profiles(scope)
+
+        return self.scope_profiles[scope]
+
+    def scope_tables(self, scope, response):
+        """
+        Function arranging the values of a scope and its sizer response into the data displayed on the dashboard.
+
+        :param scope: string
+        One of SCOPES.
+
+        :param response: dict
+        The sizer response of the scope.
+
+        :return: (DataFrame, DataFrame, DataFrame, list)
+        The sizing metrics total, the workload profiles sized, the sizer metrics and the consumed / free values of the
+        cores, memory and storage for the charts.
+        """
+        values = getattr(self, "value_dict_" + scope)
+
+        # arrange for sizer metrics
+        totals = pd.DataFrame(OrderedDict([
+            ('units', VALUES_UNITS),
+            ('values', [values[i] for i in ["VM(s)", "CPU(s)", "RAM GiB", "Storage GiB"]])
+        ]))
+        profiles = pd.DataFrame([[profile.profile_name, profile.vms_num, profile.vcpus_per_vm, profile.vram_per_vm,
+                                  profile.vmdk_size] for profile in self.get_scope_profiles(scope)],
+                                columns=PROFILE_COLUMNS)
+
+        # arrange sizer metrics & graphs
+        sddc = response['sddcInformation']
+        sized = pd.DataFrame(OrderedDict([
+            ('units', SIZED_UNITS),
+            ('values', [sddc['nodesSize'], sddc['provisionedCores'], sddc['provisionedMemory']['value'],
+                        sddc['provisionedStorage']['value'], sddc['fttAndftm']])
+        ]))
+
+        usage = [[response['cpuCoresUsage']['consumed'], response['cpuCoresUsage']['free']],
+                 [response['memoryUsage']['consumed']['value'], response['memoryUsage']['free']['value']],
+                 [response['diskSpaceUsage']['consumedStorage']['value'],
+                  response['diskSpaceUsage']['consumedSystemStorage']['value'],
+                  response['diskSpaceUsage']['freeStorage']['value']]]
+
+        return totals, profiles, sized, usage
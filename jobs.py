@@ -0,0 +1,167 @@
+# import packages
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+# states of a job, in order; the stages in between are reported by the job itself through its progress function
+QUEUED, DONE, FAILED = "queued", "done", "failed"
+
+# ids made by JobQueue.submit, the ids sent back by the browser are checked against it before they reach the directory
+JOB_ID_PATTERN = re.compile(r"[0-9a-f]{32}\Z")
+
+
+class JobQueue:
+    """
+    Local pool of worker threads running the long tasks of the dashboard (parsing dependent aggregation, sizer calls and
+    layout) outside of the web requests, which only submit a job and then poll its state.
+    A job runs holding the lock given at submit, the lock of the session backend it changes, so the jobs and the
+    requests reading the same backend never run concurrently.
+    The jobs run in the worker process that received the submit. With a directory, their state and result (which must
+    then be JSON serialisable) are also written there, so the polls answered by the other workers sharing the directory
+    see them too.
+    """
+
+    def __init__(self, max_workers=4, ttl=600, max_jobs=256, directory=None):
+        """
+        :param max_workers: int
+        Number of jobs running at the same time.
+
+        :param ttl: int
+        Number of seconds the result of a finished job is kept.
+
+        :param max_jobs: int
+        Maximum number of jobs kept in memory, the oldest finished ones are evicted first.
+
+        :param directory: string
+        Directory shared by the worker processes where the state of each job is written, None to keep the jobs local
+        to the process.
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sizing-job")
+        self.ttl = ttl
+        self.max_jobs = max_jobs
+        self.directory = directory
+
+        # job id -> dict of the job state: status, progress (0 to 100), result, error and finished time
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+
+    def submit(self, function, lock=None):
+        """
+        Function queueing a job.
+
+        :param function: callable
+        The task, called with a progress function taking the name of the current stage and the percentage done.
+
+        :param lock: lock
+        Lock held while the job runs, e.g. the lock of the session backend.
+
+        :return: string
+        The id of the job.
+        """
+        job_id = uuid.uuid4().hex
+        with self.lock:
+            self.evict()
+            self.jobs[job_id] = {"status": QUEUED, "progress": 0, "result": None, "error": None, "finished": None}
+            self.save(job_id)
+
+        self.executor.submit(self.run, job_id, function, lock)
+
+        return job_id
+
+    def run(self, job_id, function, lock):
+        def progress(status, percent):
+            self.update(job_id, status=status, progress=percent)
+
+        with lock if lock is not None else nullcontext():
+            try:
+                result = function(progress)
+            except Exception as error:
+                self.update(job_id, status=FAILED, error="{}: {}".format(type(error).__name__, error),
+                            finished=time.time())
+            else:
+                self.update(job_id, status=DONE, progress=100, result=result, finished=time.time())
+
+    def update(self, job_id, **state):
+        with self.lock:
+            if job_id in self.jobs:
+                self.jobs[job_id].update(state)
+                self.save(job_id)
+
+    def job_path(self, job_id):
+        return os.path.join(self.directory, job_id + ".json")
+
+    def save(self, job_id):
+        """
+        Function writing the state of a job to the directory, replaced at once so the readers never see a partial file.
+        Must be called with the lock held.
+
+        :param job_id: string
+        The id of the job.
+        """
+        if self.directory is None:
+            return
+
+        file = tempfile.NamedTemporaryFile("w", dir=self.directory, prefix=".tmp-", suffix=".json", delete=False)
+        try:
+            with file:
+                json.dump(self.jobs[job_id], file)
+            os.replace(file.name, self.job_path(job_id))
+        except (OSError, TypeError, ValueError):
+            # the job stays visible to this process only
+            os.remove(file.name)
+
+    def get(self, job_id):
+        """
+        Function returning the state of a job.
+
+        :param job_id: string
+        The id returned by submit.
+
+        :return: dict or None
+        A copy of the job state, None if the job is unknown to this process and to the directory, or was evicted.
+        """
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is not None:
+                return dict(job)
+
+        if self.directory is None or not isinstance(job_id, str) or not JOB_ID_PATTERN.match(job_id):
+            return None
+
+        # job run by another worker
+        try:
+            with open(self.job_path(job_id)) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def evict(self):
+        """
+        Function removing the finished jobs older than ttl and the oldest finished ones over max_jobs, and the files of
+        the directory not written for ttl seconds.
+        Must be called with the lock held.
+        """
+        now = time.time()
+        finished = [job_id for job_id, job in self.jobs.items() if job["finished"] is not None]
+        for job_id in finished:
+            if now - self.jobs[job_id]["finished"] > self.ttl or len(self.jobs) > self.max_jobs:
+                del self.jobs[job_id]
+
+        if self.directory is None:
+            return
+
+        # a running job rewrites its file at every stage
+        for entry in os.scandir(self.directory):
+            try:
+                if now - entry.stat().st_mtime > self.ttl:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                # removed by another worker
+                continue
@@ -0,0 +1,162 @@
+# import packages
+import numpy as np
+
+# i3.metal host of VMC on AWS
+I3_HOST = {
+    "name": "i3",
+    "cores": 36,
+    # GiB
+    "memory": 512,
+    # raw capacity tier, TiB
+    "storage": 10.37
+}
+
+# vSAN storage policies applied by host count: (minimum hosts, description, raw capacity used per GiB of data)
+STORAGE_POLICIES = (
+    (2, "FTT 1 - RAID-1", 2.0),
+    (6, "FTT 2 - RAID-6", 1.5)
+)
+
+
+class LocalSizer:
+    """
+    Offline sizing engine mirroring the VMC sizer recommendation.
+    Host counts are computed with numpy for any number of demands at once (see size_hosts) and recommendation returns
+    the same "genericResponse" structure as the sizer API, so it can replace SizerClient where the sizer is out of reach.
+    The model only covers the quick sizing of i3 hosts: vCPU:core ratio, CPU and memory headroom, vSAN storage policy
+    (FTT & FTM), slack space and system overhead.
+    """
+
+    def __init__(self, host=I3_HOST, policies=STORAGE_POLICIES, min_hosts=2, cpu_headroom=0.0, memory_headroom=0.0,
+                 slack=0.25, system_overhead=0.1):
+        """
+        :param host: dict
+        Specification of the host: cores, memory (GiB) and raw storage (TiB).
+
+        :param policies: tuple
+        The storage policies by host count, see STORAGE_POLICIES.
+
+        :param min_hosts: int
+        Minimum number of hosts of the SDDC.
+
+        :param cpu_headroom: float
+        Share of the cores kept free.
+
+        :param memory_headroom: float
+        Share of the memory kept free.
+
+        :param slack: float
+        Share of the vSAN raw capacity kept free as slack space.
+
+        :param system_overhead: float
+        Share of the vSAN raw capacity used by the system (metadata, management appliances).
+        """
+        self.host = host
+        self.policies = policies
+        self.min_hosts = min_hosts
+        self.cpu_headroom = cpu_headroom
+        self.memory_headroom = memory_headroom
+        self.slack = slack
+        self.system_overhead = system_overhead
+
+    def size_hosts(self, cores, memory, storage):
+        """
+        Function computing the number of hosts for arrays of demands.
+
+        :param cores: numpy array
+        Physical cores needed (vCPUs divided by the vCPU:core ratio).
+
+        :param memory: numpy array
+        Memory needed in GiB.
+
+        :param storage: numpy array
+        Storage needed in GiB, before the storage policy.
+
+        :return: (numpy array, numpy array)
+        The number of hosts and the index of the storage policy applied, for each demand.
+        """
+        cores, memory, storage = [np.asarray(values, dtype=np.float64) for values in (cores, memory, storage)]
+
+        compute_hosts = np.maximum(
+            np.ceil(cores / (self.host["cores"] * (1 - self.cpu_headroom))),
+            np.ceil(memory / (self.host["memory"] * (1 - self.memory_headroom)))
+        )
+        usable_storage = self.host["storage"] * 1024 * (1 - self.slack - self.system_overhead)
+
+        def hosts_with(factor):
+            return np.maximum.reduce([compute_hosts,
+                                      np.ceil(storage * factor / usable_storage),
+                                      np.full(compute_hosts.shape, self.min_hosts)])
+
+        # the policy depends on the number of hosts: move to the next policy when the hosts sized with the current one
+        # reach its minimum host count
+        hosts = hosts_with(self.policies[0][2])
+        policy = np.zeros(hosts.shape, dtype=int)
+        for index, (policy_min_hosts, _, factor) in enumerate(self.policies[1:], start=1):
+            switch = hosts >= policy_min_hosts
+            hosts = np.where(switch, np.maximum(hosts_with(factor), policy_min_hosts), hosts)
+            policy = np.where(switch, index, policy)
+
+        return hosts.astype(int), policy
+
+    def recommendation(self, post):
+        """
+        Function sizing the workloads of a quick sizer request.
+
+        :param post: dict
+        The JSON body of the request (see sizer.build_post).
+
+        :return: dict
+        The "genericResponse" of the request.
+        """
+        cores, memory, storage = 0.0, 0.0, 0.0
+        for workload in post["workloads"]:
+            profile = workload["vmProfile"]
+            cores += profile["vmsNum"] * profile["vCpusPerVM"] / profile["vCpusPerCore"]
+            memory += profile["vmsNum"] * profile["vRAMPerVM"]["value"]
+            storage += profile["vmsNum"] * profile["vmdkSize"]["value"]
+
+        hosts, policy = self.size_hosts([cores], [memory], [storage])
+
+        return self.generic_response(int(hosts[0]), int(policy[0]), cores, memory, storage)
+
+    def generic_response(self, hosts, policy, cores, memory, storage):
+        """
+        Function formatting a sizing like the "genericResponse" of the sizer API.
+
+        :return: dict
+        """
+        description, factor = self.policies[policy][1:]
+
+        provisioned_cores = hosts * self.host["cores"]
+        provisioned_memory = hosts * self.host["memory"]
+        provisioned_storage = hosts * self.host["storage"]
+
+        # storage in TiB, the workloads with their protection and the system part with the slack space
+        consumed_storage = storage * factor / 1024
+        system_storage = provisioned_storage * (self.slack + self.system_overhead)
+
+        return {
+            "sddcInformation": {
+                "hostType": self.host["name"],
+                "nodesSize": hosts,
+                "provisionedCores": provisioned_cores,
+                "provisionedMemory": {"value": provisioned_memory, "unit": "GiB"},
+                "provisionedStorage": {"value": round(provisioned_storage, 2), "unit": "TiB"},
+                "fttAndftm": description
+            },
+            "cpuCoresUsage": {
+                "consumed": round(cores, 2),
+                "free": round(max(provisioned_cores - cores, 0), 2)
+            },
+            "memoryUsage": {
+                "consumed": {"value": round(memory, 2), "unit": "GiB"},
+                "free": {"value": round(max(provisioned_memory - memory, 0), 2), "unit": "GiB"}
+            },
+            "diskSpaceUsage": {
+                "consumedStorage": {"value": round(consumed_storage, 2), "unit": "TiB"},
+                "consumedSystemStorage": {"value": round(system_storage, 2), "unit": "TiB"},
+                "freeStorage": {"value": round(max(provisioned_storage - consumed_storage - system_storage, 0), 2),
+                                "unit": "TiB"}
+            }
+        }
@@ -0,0 +1,98 @@
+# import packages
+import math
+
+import numpy as np
+
+# API
+from sizer import WorkloadProfile
+
+
+def quantile_buckets(values, buckets):
+    """
+    Function placing values into quantile buckets.
+
+    :param values: numpy array
+    The values to place.
+
+    :param buckets: int
+    The number of buckets, equally populated when the values allow it.
+
+    :return: numpy array of int
+    The index of the bucket of each value, from 0 to buckets - 1.
+    """
+    edges = np.quantile(values, np.linspace(0, 1, buckets + 1)[1:-1])
+
+    return np.searchsorted(edges, values, side="right")
+
+
+def profile_groups(vms, cpus, ram, storage, buckets=3):
+    """
+    Function grouping the VMs of a scope by quantile buckets of their vCPUs, RAM and storage, in one numpy pass.
+
+    :param vms: numpy array
+    Number of VMs of each row (1 unless several VMs share a name).
+
+    :param cpus: numpy array
+    vCPUs of each row.
+
+    :param ram: numpy array
+    RAM of each row in GiB.
+
+    :param storage: numpy array
+    Storage of each row in GiB.
+
+    :param buckets: int
+    Number of buckets per dimension, so at most buckets ** 3 groups.
+
+    :return: (numpy array, list of numpy array)
+    The number of VMs of each group holding VMs and the average vCPUs, RAM and storage of a VM of each group.
+    """
+    vms, cpus, ram, storage = [np.asarray(values, dtype=np.float64) for values in (vms, cpus, ram, storage)]
+    keep = vms > 0
+    vms, cpus, ram, storage = vms[keep], cpus[keep], ram[keep], storage[keep]
+
+    if not len(vms):
+        return np.zeros(0), [np.zeros(0)] * 3
+
+    # bucket of each VM on the three dimensions, combined into a single key
+    key = np.zeros(len(vms), dtype=np.int64)
+    for values in (cpus, ram, storage):
+        key = key * buckets + quantile_buckets(values / vms, buckets)
+
+    groups, inverse = np.unique(key, return_inverse=True)
+    counts = np.bincount(inverse, weights=vms)
+    # rounded so float noise never ceils a whole average up
+    per_vm = [np.round(np.bincount(inverse, weights=values) / counts, 6) for values in (cpus, ram, storage)]
+
+    return counts, per_vm
+
+
+def workload_profiles(vms, cpus, ram, storage, buckets=3, vcpus_per_core=4):
+    """
+    Function right-sizing the VMs of a scope into a few workload profiles instead of a single averaged VM.
+    Every VM is placed in a quantile bucket of its vCPUs, RAM and storage, and each combination of buckets holding VMs
+    becomes a profile of the ceiled average VM of the combination (see profile_groups).
+
+    :param vms: numpy array
+    :param cpus: numpy array
+    :param ram: numpy array
+    :param storage: numpy array
+    The VMs of the scope, see profile_groups.
+
+    :param buckets: int
+    Number of buckets per dimension, so at most buckets ** 3 profiles. 1 gives the single averaged profile.
+
+    :param vcpus_per_core: int
+    vCPU:core ratio of the profiles.
+
+    :return: list of WorkloadProfile
+    """
+    counts, per_vm = profile_groups(vms, cpus, ram, storage, buckets)
+
+    return [WorkloadProfile(vms_num=int(round(counts[group])),
+                            vcpus_per_vm=math.ceil(per_vm[0][group]),
+                            vram_per_vm=math.ceil(per_vm[1][group]),
+                            vmdk_size=math.ceil(per_vm[2][group]),
+                            vcpus_per_core=vcpus_per_core,
+                            profile_name="Workload Profile - {}".format(group + 1))
+            for group in range(len(counts))]
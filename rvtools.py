@@ -0,0 +1,583 @@
+# import packages
+import base64
+import hashlib
+import importlib.util
+import io
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# sheets of the rvtools export used by the sizer
+RVTOOLS_SHEETS = ("vInfo", "vPartition", "vMemory")
+
+# columns read from each sheet and the compact dtype they are stored as
+RVTOOLS_SCHEMA = {
+    "vInfo": {
+        "VM": "category",
+        "Powerstate": "category",
+        "CPUs": "int32",
+        "Memory": "int32",
+        "Provisioned MB": "float32",
+        "In Use MB": "float32"
+    },
+    "vPartition": {
+        "VM": "category",
+        "Powerstate": "category",
+        "Consumed MB": "float32"
+    },
+    "vMemory": {
+        "VM": "category",
+        "Powerstate": "category",
+        "Consumed": "float32"
+    }
+}
+
+# columns also read from each sheet when the export has them, used to remove VMs in bulk
+RVTOOLS_OPTIONAL_COLUMNS = {
+    "vInfo": {
+        "Folder": "category",
+        "Cluster": "category",
+        # source vCenter and identity of the VMs, used to merge several rvtools
+        "VI SDK Server": "category",
+        "VM UUID": "object"
+    }
+}
+
+# version of the schemas, part of the cache keys so the workbooks parsed with other schemas are not reused
+SCHEMA_VERSION = hashlib.sha256(repr((RVTOOLS_SCHEMA, RVTOOLS_OPTIONAL_COLUMNS)).encode()).hexdigest()[:8]
+
+# the workbook cache stores Parquet files, it is disabled when pyarrow is not installed
+PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+# sheets folded per VM when streaming, with the aggregation of each of their other schema columns
+RVTOOLS_STREAM_AGGREGATES = {
+    "vPartition": {
+        "Powerstate": "first",
+        "Consumed MB": "sum"
+    }
+}
+
+
+def apply_schema(frame, sheet, columns, optional=None):
+    """
+    Function casting the columns of a sheet to the compact dtypes of its schema.
+
+    :param frame: DataFrame
+    The sheet as read from the workbook.
+
+    :param sheet: string
+    The name of the sheet, used in the error message.
+
+    :param columns: dict
+    Dictionary of column name to dtype.
+
+    :param optional: dict
+    Dictionary of column name to dtype of the columns cast only if the sheet has them.
+
+    :return: DataFrame
+    The sheet with its schema columns cast.
+    """
+    missing = [column for column in columns if column not in frame.columns]
+    if missing:
+        raise ValueError("Sheet {} is missing the column(s): {}".format(sheet, ", ".join(missing)))
+
+    columns = dict(columns)
+    columns.update({column: dtype for column, dtype in (optional or {}).items() if column in frame.columns})
+
+    for column, dtype in columns.items():
+        # integer dtypes cannot hold empty cells, those do not count in the sums anyway
+        if dtype.startswith("int"):
+            frame[column] = frame[column].fillna(0)
+
+    return frame.astype(columns)
+
+
+def read_rvtools(source, sheets=RVTOOLS_SHEETS, schema=RVTOOLS_SCHEMA, project=True,
+                 optional=RVTOOLS_OPTIONAL_COLUMNS):
+    """
+    Function opening an rvtools workbook once and reading all requested sheets from that single parse.
+
+    :param source: bytes, path or file-like object
+    The rvtools workbook to read.
+
+    :param sheets: iterable of strings
+    The names of the sheets to read.
+
+    :param schema: dict
+    Dictionary of sheet name to a dictionary of column name to dtype. Sheets without a schema are read as is.
+
+    :param project: bool
+    If True only the columns of the schema are read, otherwise every column is read and the schema columns are cast.
+
+    :param optional: dict
+    Dictionary of sheet name to a dictionary of column name to dtype, for the columns also read if the sheet has them.
+
+    :return: (dict, dict)
+    Dictionary of sheet name to DataFrame and dictionary of stage name ("open" and each sheet name) to the load time in
+    seconds.
+    """
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+
+    timings = dict()
+    frames = dict()
+
+    # the workbook (zip archive and shared strings) is only opened and parsed once for all the sheets
+    start = time.perf_counter()
+    with pd.ExcelFile(source) as workbook:
+        timings["open"] = time.perf_counter() - start
+
+        for sheet in sheets:
+            start = time.perf_counter()
+            columns = schema.get(sheet) if schema else None
+
+            if columns is None:
+                frames[sheet] = workbook.parse(sheet)
+            else:
+                extra = optional.get(sheet, {}) if optional else {}
+                usecols = (lambda column: column in columns or column in extra) if project else None
+                frames[sheet] = apply_schema(workbook.parse(sheet, usecols=usecols), sheet, columns, extra)
+            timings[sheet] = time.perf_counter() - start
+
+    return frames, timings
+
+
+def iter_sheet_chunks(worksheet, columns, chunk_size, optional=()):
+    """
+    Generator reading the rows of a read only worksheet in chunks.
+
+    :param worksheet: openpyxl read only worksheet
+    The sheet to iterate.
+
+    :param columns: iterable of strings
+    The names of the columns to keep.
+
+    :param chunk_size: int
+    The maximum number of rows per chunk.
+
+    :param optional: iterable of strings
+    The names of the columns also kept if the sheet has them.
+
+    :return: generator of DataFrame
+    The rows of the sheet restricted to the given columns, chunk_size rows at a time.
+    """
+    rows = worksheet.iter_rows(values_only=True)
+    header = list(next(rows, ()))
+
+    missing = [column for column in columns if column not in header]
+    if missing:
+        raise ValueError("Sheet {} is missing the column(s): {}".format(worksheet.title, ", ".join(missing)))
+    columns = list(columns) + [column for column in optional if column in header and column not in columns]
+    positions = [header.index(column) for column in columns]
+
+    chunk = list()
+    for row in rows:
+        values = [row[position] if position < len(row) else None for position in positions]
+
+        # skip the formatted but empty rows at the end of the sheet
+        if all(value is None for value in values):
+            continue
+
+        chunk.append(values)
+        if len(chunk) == chunk_size:
+            yield pd.DataFrame(chunk, columns=list(columns))
+            chunk = list()
+
+    if chunk:
+        yield pd.DataFrame(chunk, columns=list(columns))
+
+
+def stream_rvtools(source, sheets=RVTOOLS_SHEETS, schema=RVTOOLS_SCHEMA, aggregates=RVTOOLS_STREAM_AGGREGATES,
+                   chunk_size=10000, optional=RVTOOLS_OPTIONAL_COLUMNS):
+    """
+    Function streaming the rows of an rvtools workbook in chunks instead of loading whole sheets.
+    The sheets in aggregates (vPartition) are folded per VM chunk by chunk so the memory used depends on the number of
+    VMs rather than on the number of rows, the other sheets are only projected to their schema columns.
+    The totals used by the sizing are the same as with read_rvtools, only the detail rows of the folded sheets are lost.
+
+    :param source: bytes, path or file-like object
+    The rvtools workbook to read.
+
+    :param sheets: iterable of strings
+    The names of the sheets to read.
+
+    :param schema: dict
+    Dictionary of sheet name to a dictionary of column name to dtype. Every streamed sheet needs a schema.
+
+    :param aggregates: dict
+    Dictionary of sheet name to a dictionary of column name to aggregation, for the sheets to fold per VM.
+
+    :param chunk_size: int
+    The number of rows read at a time.
+
+    :param optional: dict
+    Dictionary of sheet name to a dictionary of column name to dtype, for the columns also read if the sheet has them.
+    Not used for the folded sheets.
+
+    :return: (dict, dict)
+    Dictionary of sheet name to DataFrame and dictionary of stage name ("open" and each sheet name) to the load time in
+    seconds.
+    """
+    # openpyxl is only needed when streaming
+    from openpyxl import load_workbook
+
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+
+    timings = dict()
+    frames = dict()
+
+    start = time.perf_counter()
+    workbook = load_workbook(source, read_only=True, data_only=True, keep_links=False)
+    timings["open"] = time.perf_counter() - start
+
+    try:
+        for sheet in sheets:
+            start = time.perf_counter()
+            columns = schema[sheet]
+            aggregation = aggregates.get(sheet)
+            extra = optional.get(sheet, {}) if optional and aggregation is None else {}
+
+            parts = list()
+            for chunk in iter_sheet_chunks(workbook[sheet], list(columns), chunk_size, list(extra)):
+                if aggregation is not None:
+                    chunk = chunk.groupby("VM", sort=False, as_index=False).agg(aggregation)
+                parts.append(chunk)
+
+            if parts:
+                frame = pd.concat(parts, ignore_index=True)
+            else:
+                frame = pd.DataFrame(columns=list(columns))
+
+            # a VM can be split across two chunks, fold the partial results once more
+            if aggregation is not None:
+                frame = frame.groupby("VM", sort=False, as_index=False).agg(aggregation)
+
+            frames[sheet] = apply_schema(frame, sheet, columns, extra)
+            timings[sheet] = time.perf_counter() - start
+    finally:
+        # read only workbooks keep the file open until closed
+        workbook.close()
+
+    return frames, timings
+
+
+def content_hash(decoded):
+    """
+    Function hashing the bytes of an uploaded file, used as the key of the parsed workbooks.
+
+    :param decoded: bytes
+    The raw bytes of the uploaded file.
+
+    :return: string
+    The hexadecimal sha256 digest of the bytes.
+    """
+    return hashlib.sha256(decoded).hexdigest()
+
+
+def tag_vcenter(frames, name):
+    """
+    Function adding to every sheet of an rvtools the "vCenter" column naming the source vCenter of each row: the "VI SDK
+    Server" of the VM in vInfo, or the name of the file for the exports without that column.
+
+    :param frames: dict
+    Dictionary of sheet name to DataFrame.
+
+    :param name: string
+    The name of the file.
+
+    :return: dict
+    Dictionary of sheet name to the tagged DataFrame, the "VI SDK Server" column is dropped.
+    """
+    vinfo = frames["vInfo"]
+    if "VI SDK Server" in vinfo.columns:
+        servers = vinfo["VI SDK Server"].astype(object).fillna(name).values
+    else:
+        servers = np.full(len(vinfo), name, dtype=object)
+
+    # vCenter of each VM name, for the other sheets
+    vm_servers = pd.Series(servers, index=vinfo["VM"].astype(object).values)
+    vm_servers = vm_servers[~vm_servers.index.duplicated()]
+
+    tagged = dict()
+    for sheet, frame in frames.items():
+        if sheet == "vInfo":
+            values = servers
+        else:
+            values = frame["VM"].astype(object).map(vm_servers).fillna(name).values
+        tagged[sheet] = frame.drop(columns=["VI SDK Server"], errors="ignore").assign(vCenter=pd.Categorical(values))
+
+    return tagged
+
+
+def merge_workbooks(workbooks, names, schema=RVTOOLS_SCHEMA, optional=RVTOOLS_OPTIONAL_COLUMNS):
+    """
+    Function merging the rvtools of several vCenters into the sheets of a single estate.
+    Every row is tagged with its vCenter (see tag_vcenter) and the VMs found in several exports are only kept from the
+    first one: a vInfo row whose "VM UUID" was already seen is dropped, with the vMemory and vPartition rows of that VM
+    in the same export.
+
+    :param workbooks: list of dict
+    The sheets of each rvtools, dictionary of sheet name to DataFrame.
+
+    :param names: list of strings
+    The names of the files, in the same order.
+
+    :param schema: dict
+    :param optional: dict
+    The dtypes of the columns, restored after the merge (see read_rvtools).
+
+    :return: dict
+    Dictionary of sheet name to the merged DataFrame.
+    """
+    workbooks = [tag_vcenter(frames, name) for frames, name in zip(workbooks, names)]
+    if len(workbooks) == 1:
+        return workbooks[0]
+
+    # index of the export of each row
+    sources = {sheet: np.concatenate([np.full(len(frames[sheet]), index) for index, frames in enumerate(workbooks)])
+               for sheet in workbooks[0]}
+    merged = {sheet: pd.concat([frames[sheet] for frames in workbooks], ignore_index=True) for sheet in workbooks[0]}
+
+    vinfo = merged["vInfo"]
+    if "VM UUID" in vinfo.columns:
+        duplicated = (vinfo["VM UUID"].notna() & vinfo["VM UUID"].duplicated()).values
+
+        # (export, VM name) of the rows dropped, the names also kept in the same export are left alone
+        vms = vinfo["VM"].astype(object).values
+        dropped = pd.MultiIndex.from_arrays([sources["vInfo"][duplicated], vms[duplicated]])
+        kept = pd.MultiIndex.from_arrays([sources["vInfo"][~duplicated], vms[~duplicated]])
+        dropped = dropped.difference(kept)
+
+        merged["vInfo"] = vinfo[~duplicated]
+        for sheet, frame in merged.items():
+            if sheet != "vInfo" and len(dropped):
+                rows = pd.MultiIndex.from_arrays([sources[sheet], frame["VM"].astype(object).values])
+                merged[sheet] = frame[~rows.isin(dropped)]
+
+    # the categorical columns of different exports are concatenated as objects
+    for sheet, frame in merged.items():
+        frame = apply_schema(frame.reset_index(drop=True), sheet, schema[sheet], optional.get(sheet))
+        merged[sheet] = frame.astype({"vCenter": "category"})
+
+    return merged
+
+
+def spool_contents(contents, chunk_size=4 * 1024 ** 2, named=False):
+    """
+    Function decoding the contents string handed by the dcc.Upload object into a temporary file, a chunk at a time, so
+    the decoded bytes are never held in memory next to the base64 string.
+
+    :param contents: string
+    The "data:<content type>;base64,<data>" string of one uploaded file.
+
+    :param chunk_size: int
+    The number of base64 characters decoded at a time, rounded down to a multiple of 4.
+
+    :param named: bool
+    If True the file has a path other processes can open and is not deleted once closed, the caller removes it.
+
+    :return: (file object, string)
+    The temporary file positioned at its start, deleted once closed unless named, and the hexadecimal sha256 digest of
+    its bytes.
+    """
+    chunk_size -= chunk_size % 4
+    file = tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False) if named else tempfile.TemporaryFile()
+    digest = hashlib.sha256()
+
+    try:
+        for start in range(contents.index(',') + 1, len(contents), chunk_size):
+            block = base64.b64decode(contents[start:start + chunk_size])
+            digest.update(block)
+            file.write(block)
+
+        file.seek(0)
+    except BaseException:
+        # invalid contents: the caller never gets the file to remove
+        file.close()
+        if named:
+            os.remove(file.name)
+        raise
+
+    return file, digest.hexdigest()
+
+
+def spool_stream(stream, chunk_size=1024 ** 2):
+    """
+    Function copying a stream (e.g. the body of an upload request) into a temporary file, a chunk at a time.
+
+    :param stream: file-like object
+    The stream to read until its end.
+
+    :param chunk_size: int
+    The number of bytes read at a time.
+
+    :return: (file object, string)
+    The temporary file positioned at its start, deleted once closed, and the hexadecimal sha256 digest of its bytes.
+    """
+    file = tempfile.TemporaryFile()
+    digest = hashlib.sha256()
+
+    for block in iter(lambda: stream.read(chunk_size), b""):
+        digest.update(block)
+        file.write(block)
+
+    file.seek(0)
+
+    return file, digest.hexdigest()
+
+
+def cache_directory(name):
+    """
+    Function returning a directory of the on disk caches, private to the user running the dashboard: "<name>" in the
+    directory of the environment variable AUTO_SIZER_CACHE_DIR, or in "auto_sizer" of the user cache directory
+    (XDG_CACHE_HOME or ~/.cache). The directory is created with mode 0700.
+
+    :param name: string
+    The name of the cache, e.g. "workbooks".
+
+    :return: string
+    The path of the directory.
+    """
+    base = os.environ.get("AUTO_SIZER_CACHE_DIR")
+    if not base:
+        base = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+                            "auto_sizer")
+
+    directory = os.path.join(base, name)
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    # fails if the directory belongs to another user
+    os.chmod(directory, 0o700)
+
+    return directory
+
+
+class WorkbookCache:
+    """
+    On disk cache of parsed rvtools sheets keyed by the hash of the uploaded file.
+    Every entry is a directory holding one Parquet file per sheet, the least recently used entries are evicted once the
+    cache grows over its size cap. Being on disk, the cache is shared by all the processes of the user using the same
+    directory. Needs pyarrow (see PARQUET_AVAILABLE).
+    """
+
+    def __init__(self, directory=None, max_bytes=2 * 1024 ** 3):
+        """
+        :param directory: string
+        The directory of the cache, defaults to cache_directory("workbooks").
+
+        :param max_bytes: int
+        The size cap of the cache in bytes.
+        """
+        if not PARQUET_AVAILABLE:
+            raise ImportError("The workbook cache needs pyarrow to write Parquet files")
+
+        self.directory = directory or cache_directory("workbooks")
+        self.max_bytes = max_bytes
+
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+
+    def entry_path(self, key):
+        # the keys are plain file names, never paths out of the cache directory
+        if not key or key.startswith(".") or any(separator in key for separator in ("/", "\\", os.sep)):
+            raise ValueError("Invalid workbook cache key: {!r}".format(key))
+
+        return os.path.join(self.directory, key)
+
+    def contains(self, key):
+        """
+        Function checking if an entry is stored under a key, without loading it.
+
+        :param key: string
+        The key of the entry.
+
+        :return: bool
+        True if the key is cached.
+        """
+        return os.path.isdir(self.entry_path(key))
+
+    def get(self, key):
+        """
+        Function loading the sheets stored under a key.
+
+        :param key: string
+        The key of the entry.
+
+        :return: dict or None
+        Dictionary of sheet name to DataFrame, None if the key is not cached.
+        """
+        path = self.entry_path(key)
+        try:
+            files = [name for name in os.listdir(path) if name.endswith(".parquet")]
+        except FileNotFoundError:
+            return None
+
+        frames = dict()
+        try:
+            for name in files:
+                frames[name[:-len(".parquet")]] = pd.read_parquet(os.path.join(path, name))
+
+            # mark the entry as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            # evicted by another process while reading
+            return None
+
+        return frames
+
+    def put(self, key, frames):
+        """
+        Function storing the sheets of a parsed workbook under a key, then evicting entries over the size cap.
+        Caching is best effort: the entry is skipped if it cannot be written.
+
+        :param key: string
+        The key of the entry.
+
+        :param frames: dict
+        Dictionary of sheet name to DataFrame.
+        """
+        path = self.entry_path(key)
+        if os.path.isdir(path):
+            return
+
+        # write in a temporary directory renamed at the end so readers never see a partial entry
+        temp_path = tempfile.mkdtemp(dir=self.directory, prefix=".tmp-")
+        try:
+            for sheet, frame in frames.items():
+                frame.to_parquet(os.path.join(temp_path, "{}.parquet".format(sheet)), index=False)
+            os.rename(temp_path, path)
+        except Exception:
+            # another process stored the same entry first, or a sheet cannot be serialised (e.g. an unprojected column
+            # of mixed types): the workbook is just not cached
+            pass
+        finally:
+            shutil.rmtree(temp_path, ignore_errors=True)
+
+        self.evict()
+
+    def evict(self):
+        """
+        Function removing the least recently used entries until the cache is under its size cap.
+        """
+        entries = list()
+        total = 0
+        for key in os.listdir(self.directory):
+            # entries being written by other processes (".tmp-*") or left over by a killed one are not entries
+            path = os.path.join(self.directory, key)
+            if key.startswith(".") or not os.path.isdir(path):
+                continue
+            try:
+                size = sum(entry.stat().st_size for entry in os.scandir(path))
+                entries.append((os.stat(path).st_mtime, size, path))
+            except FileNotFoundError:
+                continue
+            total += size
+
+        for mtime, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
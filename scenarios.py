@@ -0,0 +1,155 @@
+# import packages
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# sizing logic, without dash
+from core import SCOPES, SizingCore, scope_demands, vm_contributions
+from local_sizer import LocalSizer
+from right_sizing import profile_groups
+from sizer import ResponseCache, WorkloadProfile, build_post
+
+
+def sweep_scenarios(backend, growth=(1.0,), vcpus_per_core=(4,), exclusions=None, exclude_powered_off=(True,),
+                    scopes=SCOPES, buckets=None, max_workers=8):
+    """
+    Function sizing every combination of growth factor, vCPU:core ratio, set of removed VMs and powered off option of
+    the rvtools opened by a backend, and returning them side by side.
+    The per VM contributions are computed once per powered off option and the demands of a scope once per set of
+    removed VMs, the growth factors and ratios only scale the resulting workload profiles. Identical sizer requests are
+    only sent once.
+
+    :param backend: SizingCore
+    The backend holding the rvtools, its own sizing state is left untouched.
+
+    :param growth: iterable of float
+    Growth factors of the number of VMs, 1 for the estate as it is.
+
+    :param vcpus_per_core: iterable of int
+    vCPU:core ratios.
+
+    :param exclusions: dict
+    Dictionary of name to the list of VM names removed in that scenario, only the full estate ("none") by default.
+
+    :param exclude_powered_off: iterable of bool
+    Powered off options, True to leave the powered off VMs out.
+
+    :param scopes: iterable of strings
+    The scopes sized, see core.SCOPES.
+
+    :param buckets: int
+    Quantile buckets per dimension of the workload profiles, the backend's profile_buckets by default.
+
+    :param max_workers: int
+    Maximum number of sizer requests sent at the same time.
+
+    :return: DataFrame
+    One row per scenario with its parameters, the scope totals, the id of its sizer request and the sizing.
+    """
+    growth = np.asarray(growth, dtype=np.float64)
+    exclusions = exclusions if exclusions is not None else {"none": ()}
+    buckets = backend.profile_buckets if buckets is None else buckets
+    facts = backend.get_vm_facts()
+
+    # sizer request of each key, in the order they first appear
+    posts = dict()
+    rows = list()
+    for exclude_off in exclude_powered_off:
+        contributions, powered_off_sto = vm_contributions(facts, exclude_off)
+
+        for exclusion, removed_vms in exclusions.items():
+            for scope in scopes:
+                demands = scope_demands(contributions, scope, removed_vms, powered_off_sto)
+                totals = [float(np.sum(values)) for values in demands]
+
+                # VMs of each profile for every growth factor, and the size of a VM of each profile
+                counts, per_vm = profile_groups(*demands, buckets=buckets)
+                grown = np.ceil(np.round(np.outer(counts, growth), 6)).astype(int)
+                per_vm = [np.ceil(values).astype(int) for values in per_vm]
+
+                for position, factor in enumerate(growth):
+                    for ratio in vcpus_per_core:
+                        post = build_post([
+                            WorkloadProfile(vms_num=int(grown[group, position]),
+                                            vcpus_per_vm=int(per_vm[0][group]),
+                                            vram_per_vm=int(per_vm[1][group]),
+                                            vmdk_size=int(per_vm[2][group]),
+                                            vcpus_per_core=int(ratio),
+                                            profile_name="Workload Profile - {}".format(group + 1))
+                            for group in range(len(counts))
+                        ])
+                        key = ResponseCache.key(post)
+                        posts.setdefault(key, post)
+
+                        rows.append({"scope": scope,
+                                     "growth": float(factor),
+                                     "vCpusPerCore": int(ratio),
+                                     "exclusion": exclusion,
+                                     "exclude powered off": bool(exclude_off),
+                                     "VM(s)": totals[0] * factor,
+                                     "CPU(s)": totals[1] * factor,
+                                     "RAM GiB": totals[2] * factor,
+                                     "Storage GiB": totals[3] * factor,
+                                     "Workload Profiles": len(counts),
+                                     "key": key})
+
+    # every distinct request is sent once
+    client = backend.get_sizer_client()
+    keys = list(posts)
+    with ThreadPoolExecutor(max_workers=max(min(len(keys), max_workers), 1)) as executor:
+        responses = dict(zip(keys, executor.map(lambda key: client.recommendation(posts[key]), keys)))
+
+    request_ids = {key: index for index, key in enumerate(keys)}
+    for row in rows:
+        key = row.pop("key")
+        sddc = responses[key]['sddcInformation']
+        row.update({"Sizer Request": request_ids[key],
+                    "Host Count": sddc['nodesSize'],
+                    "Total Cores": sddc['provisionedCores'],
+                    "Total Memory": sddc['provisionedMemory']['value'],
+                    "Total Storage": sddc['provisionedStorage']['value'],
+                    "FTT & FTM": sddc['fttAndftm']})
+
+    return pd.DataFrame(rows)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Size an rvtools for every combination of the given parameters.")
+    parser.add_argument("rvtools", help="the rvtools (.xlsx)")
+    parser.add_argument("-o", "--output", default="scenarios.csv", help="comparison table (.csv or .xlsx)")
+    parser.add_argument("--growth", type=float, nargs="+", default=[1.0], help="growth factors of the number of VMs")
+    parser.add_argument("--vcpus-per-core", type=int, nargs="+", default=[4], help="vCPU:core ratios")
+    parser.add_argument("--exclude", action="append", default=[],
+                        help="glob patterns of VM names removed in an extra scenario, e.g. 'test-*,*-old' (repeatable)")
+    parser.add_argument("--powered-off", choices=["exclude", "keep", "both"], default="exclude",
+                        help="powered off VMs left out, kept or both")
+    parser.add_argument("--profile-buckets", type=int, default=3,
+                        help="quantile buckets per dimension of the workload profiles, 1 for a single averaged profile")
+    parser.add_argument("--local", action="store_true", help="size with the offline engine instead of the VMC sizer")
+    args = parser.parse_args(args)
+
+    if args.local:
+        SizingCore.sizer_client = LocalSizer()
+
+    backend = SizingCore()
+    backend.profile_buckets = args.profile_buckets
+    backend.load_path(args.rvtools)
+
+    exclusions = {"none": []}
+    exclusions.update({patterns: backend.select_vms(patterns=patterns) for patterns in args.exclude})
+    exclude_powered_off = {"exclude": [True], "keep": [False], "both": [True, False]}[args.powered_off]
+
+    results = sweep_scenarios(backend, args.growth, args.vcpus_per_core, exclusions, exclude_powered_off)
+    if args.output.endswith(".xlsx"):
+        results.to_excel(args.output, index=False)
+    else:
+        results.to_csv(args.output, index=False)
+
+    print("{} scenarios sized with {} sizer requests, results written to {}".format(
+        len(results), results["Sizer Request"].nunique(), args.output))
+
+
+if __name__ == "__main__":
+    main()
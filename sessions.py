@@ -0,0 +1,76 @@
+# import packages
+import threading
+import time
+from collections import OrderedDict
+
+
+class SessionStore:
+    """
+    Server side store keeping one backend object per dashboard session.
+    Sessions not used for more than ttl seconds are evicted, so the memory of the parsed rvtools is released once the
+    consultant is gone. The store is local to the worker process: a worker that does not know a session rebuilds its
+    backend from the workbook cache (see Backend.restore), which is shared on disk by all the workers.
+    """
+
+    def __init__(self, factory, ttl=3600, max_sessions=64):
+        """
+        :param factory: callable
+        Function without arguments creating the backend object of a new session.
+
+        :param ttl: int
+        Number of seconds a session is kept without being used.
+
+        :param max_sessions: int
+        Maximum number of sessions kept by the worker, the least recently used are evicted first.
+        """
+        self.factory = factory
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+
+        # session id -> [last used time, backend], ordered from least to most recently used
+        self.sessions = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, session_id):
+        """
+        Function returning the backend of a session, created if the session is new or was evicted.
+
+        :param session_id: string
+        The id of the session.
+
+        :return: backend object
+        The backend of the session.
+        """
+        with self.lock:
+            if session_id in self.sessions:
+                self.sessions.move_to_end(session_id)
+            else:
+                self.sessions[session_id] = [None, self.factory()]
+
+            session = self.sessions[session_id]
+            session[0] = time.monotonic()
+            self.evict()
+
+            return session[1]
+
+    def drop(self, session_id):
+        """
+        Function removing a session from the store.
+
+        :param session_id: string
+        The id of the session.
+        """
+        with self.lock:
+            self.sessions.pop(session_id, None)
+
+    def evict(self):
+        """
+        Function removing the expired sessions and the least recently used ones over max_sessions.
+        Must be called with the lock held.
+        """
+        now = time.monotonic()
+        while self.sessions:
+            session_id, (last_used, backend) = next(iter(self.sessions.items()))
+            if now - last_used <= self.ttl and len(self.sessions) <= self.max_sessions:
+                break
+            del self.sessions[session_id]
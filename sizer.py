@@ -0,0 +1,250 @@
+# import packages
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+# VMC sizer endpoint
+DEFAULT_SIZER_URL = "https://vmc.vmware.com"
+RECOMMENDATION_PATH = "/api/sizer/v4/recommendation"
+
+
+@dataclass(frozen=True)
+class WorkloadProfile:
+    """
+    Immutable workload profile of a sizer request, serialised into a new dictionary for every request so a profile can
+    be shared by any number of threads.
+    """
+
+    # number of VMs of the profile
+    vms_num: int = 1000
+    # vCPUs, RAM (GiB) and storage (GiB) of each VM
+    vcpus_per_vm: int = 2
+    vram_per_vm: float = 200
+    vmdk_size: float = 200
+    # vCPU:core ratio
+    vcpus_per_core: int = 4
+    profile_name: str = "Workload Profile - 1"
+    workload_type: str = "GPW_GVM"
+
+    def to_workload(self):
+        """
+        Function serialising the profile into an entry of the "workloads" list of a sizer request.
+
+        :return: dict
+        """
+        return {
+            "profileName": self.profile_name,
+            "vmProfile": {
+                "vCpusPerCore": self.vcpus_per_core,
+                "vCpusPerVM": self.vcpus_per_vm,
+                "vRAMPerVM": {
+                    "value": self.vram_per_vm
+                },
+                "vmdkSize": {
+                    "value": self.vmdk_size
+                },
+                "vmsNum": self.vms_num
+            },
+            "workloadType": self.workload_type
+        }
+
+
+def build_post(profiles, global_specs=None):
+    """
+    Function building the JSON body of a quick sizer request.
+
+    :param profiles: iterable of WorkloadProfile
+    The workload profiles to size together.
+
+    :param global_specs: dict
+    The "globalSpecs" of the request, empty by default.
+
+    :return: dict
+    """
+    return {
+        "globalSpecs": dict(global_specs or {}),
+        "workloads": [profile.to_workload() for profile in profiles]
+    }
+
+
+class ResponseCache:
+    """
+    Cache of the sizer responses keyed by the normalised request.
+    Responses are kept in memory (least recently used evicted over max_entries) and optionally in a directory as JSON
+    files shared by the processes, both tiers expire after ttl seconds.
+    """
+
+    def __init__(self, max_entries=1024, ttl=24 * 3600, directory=None):
+        """
+        :param max_entries: int
+        Maximum number of responses kept in memory.
+
+        :param ttl: int
+        Number of seconds a response is reused.
+
+        :param directory: string
+        Directory of the on disk tier, None to only cache in memory.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.directory = directory
+
+        # key -> (expiry time, response), ordered from least to most recently used
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(*parts):
+        """
+        Function hashing a request, the dictionaries are serialised with sorted keys so the order does not matter.
+
+        :return: string
+        """
+        normalised = json.dumps(parts, sort_keys=True, separators=(",", ":"))
+
+        return hashlib.sha256(normalised.encode()).hexdigest()
+
+    def get(self, key):
+        """
+        Function returning the cached response of a request key.
+
+        :return: dict or None
+        The response, None if it is not cached or expired.
+        """
+        now = time.time()
+        with self.lock:
+            if key in self.entries:
+                expires, response = self.entries[key]
+                if expires > now:
+                    self.entries.move_to_end(key)
+                    return response
+                del self.entries[key]
+
+        if self.directory is None:
+            return None
+
+        try:
+            with open(os.path.join(self.directory, key + ".json")) as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+
+        if entry["expires"] <= now:
+            return None
+
+        self.remember(key, entry["expires"], entry["response"])
+
+        return entry["response"]
+
+    def put(self, key, response):
+        """
+        Function caching the response of a request key.
+        """
+        expires = time.time() + self.ttl
+        self.remember(key, expires, response)
+
+        if self.directory is not None:
+            # write then rename so other processes never read a partial file
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w") as file:
+                json.dump({"expires": expires, "response": response}, file)
+            os.replace(temp_path, os.path.join(self.directory, key + ".json"))
+
+    def remember(self, key, expires, response):
+        with self.lock:
+            self.entries[key] = (expires, response)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+class SizerClient:
+    """
+    Client of the VMC sizer API.
+    The client keeps a pool of keep-alive connections shared by the threads using it, every call has a connect and read
+    timeout and is retried with an exponential backoff when the sizer answers 429 or 5xx.
+    """
+
+    def __init__(self, base_url=DEFAULT_SIZER_URL, timeout=(5, 30), retries=3, backoff_factor=0.5, pool_size=10,
+                 cloud_provider="VMC_ON_AWS", cache=None):
+        """
+        :param base_url: string
+        Scheme and host of the sizer, e.g. "http://localhost:8050" for a local stand-in server.
+
+        :param timeout: float or (float, float)
+        Seconds to wait for the connection and for the response of each call.
+
+        :param retries: int
+        Maximum number of retries of a call.
+
+        :param backoff_factor: float
+        Base of the exponential wait between retries, in seconds.
+
+        :param pool_size: int
+        Maximum number of connections kept open to the sizer.
+
+        :param cloud_provider: string
+        The cloudProviderType parameter of the recommendation.
+
+        :param cache: ResponseCache
+        Cache of the responses, identical requests are then only sent once. None to always call the sizer.
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.cloud_provider = cloud_provider
+        self.cache = cache
+
+        # requests is only needed by the processes calling the sizer API
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        retry = Retry(total=retries,
+                      backoff_factor=backoff_factor,
+                      status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=frozenset(["POST"]),
+                      respect_retry_after_header=True)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.headers.update({'content-type': 'application/json'})
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def recommendation(self, post):
+        """
+        Function requesting a recommendation from the sizer.
+
+        :param post: dict
+        The JSON body of the request (see build_post).
+
+        :return: dict
+        The "genericResponse" part of the answer.
+        """
+        if self.cache is not None:
+            key = self.cache.key(self.base_url, self.cloud_provider, post)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        response = self.session.post(self.base_url + RECOMMENDATION_PATH,
+                                     params={"cloudProviderType": self.cloud_provider},
+                                     json=post, timeout=self.timeout)
+        response.raise_for_status()
+        generic_response = response.json()['genericResponse']
+
+        if self.cache is not None:
+            self.cache.put(key, generic_response)
+
+        return generic_response
+
+    def close(self):
+        self.session.close()
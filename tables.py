@@ -0,0 +1,124 @@
+# import packages
+import math
+
+import pandas as pd
+
+# operators of the dash_table filter query, the first of each list is the name used in the filtering
+FILTER_OPERATORS = [['ge ', '>='],
+                    ['le ', '<='],
+                    ['lt ', '<'],
+                    ['gt ', '>'],
+                    ['ne ', '!='],
+                    ['eq ', '='],
+                    ['contains '],
+                    ['datestartswith ']]
+
+
+def split_filter_part(filter_part):
+    """
+    Function parsing one condition of a dash_table filter query, e.g. "{CPUs} >= 4".
+
+    :param filter_part: string
+    The condition.
+
+    :return: (string, string, value)
+    The column name, the operator name and the value, all None if the condition could not be parsed.
+    """
+    for operator_type in FILTER_OPERATORS:
+        for operator in operator_type:
+            if operator in filter_part:
+                name_part, value_part = filter_part.split(operator, 1)
+                name = name_part[name_part.find('{') + 1: name_part.rfind('}')]
+
+                value_part = value_part.strip()
+                if not value_part:
+                    return [None] * 3
+
+                quote = value_part[0]
+                if quote == value_part[-1] and quote in ("'", '"', '`') and len(value_part) > 1:
+                    value = value_part[1: -1].replace('\\' + quote, quote)
+                else:
+                    try:
+                        value = float(value_part)
+                    except ValueError:
+                        value = value_part
+
+                return name, operator_type[0].strip(), value
+
+    return [None] * 3
+
+
+def filter_frame(frame, filter_query):
+    """
+    Function applying a dash_table filter query to a DataFrame.
+
+    :param frame: DataFrame
+    The table to filter.
+
+    :param filter_query: string
+    The conditions joined by " && ".
+
+    :return: DataFrame
+    The rows matching every condition, unknown columns, unparsable conditions and comparisons of a numeric column with
+    a value that is not a number are ignored.
+    """
+    if not filter_query:
+        return frame
+
+    for filter_part in filter_query.split(' && '):
+        name, operator, value = split_filter_part(filter_part)
+        if name not in frame.columns:
+            continue
+
+        column = frame[name]
+        if operator in ('eq', 'ne', 'lt', 'le', 'gt', 'ge'):
+            # values typed in the filter of a text column are compared as text, a numeric column ignores the values
+            # that are not numbers
+            if not pd.api.types.is_numeric_dtype(column):
+                column, value = column.astype(str), str(value)
+            else:
+                value = pd.to_numeric(value, errors='coerce')
+                if pd.isna(value):
+                    continue
+            frame = frame.loc[getattr(column, operator)(value)]
+        elif operator == 'contains':
+            frame = frame.loc[column.astype(str).str.contains(str(value), case=False, regex=False)]
+        elif operator == 'datestartswith':
+            frame = frame.loc[column.astype(str).str.startswith(str(value))]
+
+    return frame
+
+
+def table_page(frame, page_current, page_size, sort_by=None, filter_query=None):
+    """
+    Function filtering, sorting and slicing a DataFrame into the page displayed by a dash_table with custom paging.
+
+    :param frame: DataFrame
+    The full table.
+
+    :param page_current: int
+    The index of the page, from 0.
+
+    :param page_size: int
+    The number of rows per page.
+
+    :param sort_by: list of dict
+    The sort_by property of the table: {"column_id": ..., "direction": "asc" or "desc"}.
+
+    :param filter_query: string
+    The filter_query property of the table.
+
+    :return: (list of dict, int)
+    The records of the page and the number of pages.
+    """
+    frame = filter_frame(frame, filter_query)
+
+    sort_by = [sort for sort in (sort_by or []) if sort['column_id'] in frame.columns]
+    if sort_by:
+        frame = frame.sort_values([sort['column_id'] for sort in sort_by],
+                                  ascending=[sort['direction'] == 'asc' for sort in sort_by])
+
+    page_current = page_current or 0
+    page = frame.iloc[page_current * page_size: (page_current + 1) * page_size]
+
+    return page.to_dict('records'), max(math.ceil(len(frame) / page_size), 1)
@@ -0,0 +1,57 @@
+# import packages
+import pandas as pd
+import pytest
+
+# sizing logic of the dashboard backend
+from core import SCOPES, SizingCore
+
+
+def make_frames():
+    vms = ["web-01", "web-02", "db-01", "test-01", "old-01"]
+    power = ["poweredOn", "poweredOn", "poweredOn", "poweredOn", "poweredOff"]
+    vinfo = pd.DataFrame({"VM": pd.Categorical(vms), "Powerstate": pd.Categorical(power),
+                          "CPUs": [2, 4, 8, 1, 2], "Memory": [4096, 8192, 32768, 1024, 2048],
+                          "Provisioned MB": [40960.0, 81920.0, 512000.0, 20480.0, 40960.0],
+                          "In Use MB": [20480.0, 40960.0, 409600.0, 10240.0, 30720.0]})
+    # test-01 has no VM Tools, so no vPartition row, and db-01 has two partitions
+    vpartition = pd.DataFrame({"VM": pd.Categorical(["web-01", "web-02", "db-01", "db-01", "old-01"]),
+                               "Powerstate": pd.Categorical(["poweredOn"] * 4 + ["poweredOff"]),
+                               "Consumed MB": [10240.0, 20480.0, 200000.0, 100000.0, 30000.0]})
+    vmemory = pd.DataFrame({"VM": pd.Categorical(vms), "Powerstate": pd.Categorical(power),
+                            "Consumed": [2048.0, 4096.0, 30000.0, 512.0, 0.0]})
+
+    return {"vInfo": vinfo, "vPartition": vpartition, "vMemory": vmemory}
+
+
+def summary(exclude_vm, removed_vms, core=None):
+    if core is None:
+        core = SizingCore()
+        core.filename = "rvtools.xlsx"
+        core.set_sheets(make_frames())
+
+    core.set_options(exclude_vm, removed_vms)
+    core.vinfo_summary()
+
+    return core, {scope: getattr(core, "value_dict_" + scope) for scope in SCOPES}
+
+
+def test_incremental_totals_match_recompute():
+    core, _ = summary(["yes"], [])
+
+    # each submit updates the running totals of the previous one
+    for exclude_vm, removed_vms in ((["yes"], ["db-01"]), (["yes"], ["db-01", "web-02"]), (["yes"], ["web-02"]),
+                                    ([], ["web-02", "old-01"]), ([], []), (["yes"], ["unknown-vm"])):
+        _, incremental = summary(exclude_vm, removed_vms, core)
+        _, recomputed = summary(exclude_vm, removed_vms)
+
+        for scope in SCOPES:
+            assert incremental[scope] == pytest.approx(recomputed[scope])
+
+
+def test_removed_vms_leave_the_totals():
+    _, values = summary([], ["db-01"])
+
+    assert values["provisioned"]["VM(s)"] == 4
+    assert values["provisioned"]["CPU(s)"] == 9
+    assert values["provisioned"]["RAM GiB"] == pytest.approx((4096 + 8192 + 1024 + 2048) / 1024)
+
@@ -0,0 +1,34 @@
+# offline sizing engine and sizer requests
+from local_sizer import I3_HOST, LocalSizer
+from sizer import WorkloadProfile, build_post
+
+# raw storage of a host usable by the workloads, GiB
+USABLE_STORAGE = I3_HOST["storage"] * 1024 * (1 - 0.25 - 0.1)
+
+
+def test_size_hosts_compute_bound():
+    hosts, policy = LocalSizer().size_hosts([10, 36 * 5, 36 * 6, 36 * 28], [0] * 4, [0] * 4)
+
+    # at least min_hosts, RAID-6 from 6 hosts on
+    assert list(hosts) == [2, 5, 6, 28]
+    assert list(policy) == [0, 0, 1, 1]
+
+
+def test_size_hosts_storage_switches_policy():
+    hosts, policy = LocalSizer().size_hosts([0, 0], [0, 0], [USABLE_STORAGE * 2.5, USABLE_STORAGE * 4.5])
+
+    # RAID-1 doubles the storage: 5 hosts, while 9 hosts would reach RAID-6, which needs 7 of them
+    assert list(hosts) == [5, 7]
+    assert list(policy) == [0, 1]
+
+
+def test_recommendation():
+    post = build_post([WorkloadProfile(vms_num=100, vcpus_per_vm=4, vram_per_vm=16, vmdk_size=100)])
+    response = LocalSizer().recommendation(post)
+
+    # 100 cores and 1600 GiB: 4 hosts of memory
+    assert response["sddcInformation"]["nodesSize"] == 4
+    assert response["sddcInformation"]["fttAndftm"] == "FTT 1 - RAID-1"
+    assert response["cpuCoresUsage"]["consumed"] == 100
+    assert response["memoryUsage"]["consumed"]["value"] == 1600
+    assert response["diskSpaceUsage"]["consumedStorage"]["value"] == round(10000 * 2.0 / 1024, 2)
@@ -0,0 +1,88 @@
+# import packages
+import os
+
+import pandas as pd
+
+# rvtools loading
+from rvtools import WorkbookCache, merge_workbooks
+
+
+def make_frames():
+    return {"vInfo": pd.DataFrame({"VM": pd.Categorical(["web-01", "db-01"]), "CPUs": [2, 4]})}
+
+
+def make_export(vms, uuids, server=None):
+    on = ["poweredOn"] * len(vms)
+    vinfo = pd.DataFrame({"VM": vms, "Powerstate": on, "CPUs": [2] * len(vms), "Memory": [4096] * len(vms),
+                          "Provisioned MB": [1024.0] * len(vms), "In Use MB": [512.0] * len(vms), "VM UUID": uuids})
+    if server is not None:
+        vinfo["VI SDK Server"] = server
+
+    return {"vInfo": vinfo,
+            "vPartition": pd.DataFrame({"VM": vms, "Powerstate": on, "Consumed MB": [256.0] * len(vms)}),
+            "vMemory": pd.DataFrame({"VM": vms, "Powerstate": on, "Consumed": [2048.0] * len(vms)})}
+
+
+def test_cache_put_get(tmp_path):
+    cache = WorkbookCache(str(tmp_path))
+    cache.put("key", make_frames())
+
+    frames = cache.get("key")
+    assert list(frames) == ["vInfo"]
+    assert list(frames["vInfo"]["VM"].astype(str)) == ["web-01", "db-01"]
+    assert cache.get("missing") is None
+    assert cache.contains("key") and not cache.contains("missing")
+
+
+def test_cache_put_with_temporary_directory(tmp_path):
+    # another writer is storing an entry, or was killed while storing it
+    os.mkdir(os.path.join(str(tmp_path), ".tmp-otherwriter"))
+    cache = WorkbookCache(str(tmp_path))
+
+    cache.put("key", make_frames())
+
+    assert cache.get("key") is not None
+    assert os.path.isdir(os.path.join(str(tmp_path), ".tmp-otherwriter"))
+
+
+def test_cache_put_skips_unserialisable_sheets(tmp_path):
+    cache = WorkbookCache(str(tmp_path))
+    cache.put("key", {"vInfo": pd.DataFrame({"Annotation": [1, "x"]})})
+
+    assert cache.get("key") is None and not cache.contains("key")
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_cache_rejects_paths(tmp_path):
+    cache = WorkbookCache(str(tmp_path))
+
+    for key in ("../outside", ".tmp-x", "a/b", ""):
+        try:
+            cache.get(key)
+        except ValueError:
+            continue
+        raise AssertionError("key accepted: {!r}".format(key))
+
+
+def test_merge_workbooks_drops_vms_exported_twice():
+    # web-01 is exported by both vCenters, the second export has no "VI SDK Server" column
+    merged = merge_workbooks([make_export(["web-01", "db-01"], ["u1", "u2"], server="vc-a"),
+                              make_export(["web-01", "app-01"], ["u1", "u3"])], ["a.xlsx", "b.xlsx"])
+
+    vinfo = merged["vInfo"]
+    assert list(vinfo["VM"].astype(str)) == ["web-01", "db-01", "app-01"]
+    assert list(vinfo["vCenter"].astype(str)) == ["vc-a", "vc-a", "b.xlsx"]
+    assert "VI SDK Server" not in vinfo.columns
+
+    # the other sheets of the dropped VM go with it
+    for sheet in ("vPartition", "vMemory"):
+        rows = merged[sheet][["VM", "vCenter"]].astype(str).values.tolist()
+        assert rows == [["web-01", "vc-a"], ["db-01", "vc-a"], ["app-01", "b.xlsx"]]
+
+
+def test_merge_workbooks_keeps_distinct_vms_of_the_same_name():
+    merged = merge_workbooks([make_export(["web-01"], ["u1"], server="vc-a"),
+                              make_export(["web-01"], ["u2"], server="vc-b")], ["a.xlsx", "b.xlsx"])
+
+    assert list(merged["vInfo"]["vCenter"].astype(str)) == ["vc-a", "vc-b"]
+    assert list(merged["vMemory"]["vCenter"].astype(str)) == ["vc-a", "vc-b"]
@@ -0,0 +1,68 @@
+# import packages
+import pandas as pd
+
+# paging, filtering and sorting of the rvtools tables
+from tables import filter_frame, split_filter_part, table_page
+
+
+def make_frame():
+    return pd.DataFrame({
+        "VM": pd.Categorical(["web-01", "web-02", "db-01", "test-01"]),
+        "CPUs": pd.Series([2, 4, 8, 1], dtype="int32"),
+        "Provisioned MB": pd.Series([1024.0, 2048.5, 4096.0, 512.0], dtype="float32")
+    })
+
+
+def test_split_filter_part():
+    assert split_filter_part("{CPUs} >= 4") == ("CPUs", "ge", 4.0)
+    assert split_filter_part("{VM} contains web") == ("VM", "contains", "web")
+    assert split_filter_part("{VM} = 'db-01'") == ("VM", "eq", "db-01")
+    assert split_filter_part("{VM} = \"it's\"") == ("VM", "eq", "it's")
+    assert split_filter_part("{CPUs} < abc") == ("CPUs", "lt", "abc")
+
+
+def test_split_filter_part_unparsable():
+    assert split_filter_part("{CPUs} >= ") == [None] * 3
+    assert split_filter_part("CPUs") == [None] * 3
+
+
+def test_filter_frame_numeric():
+    frame = make_frame()
+
+    assert list(filter_frame(frame, "{CPUs} >= 4")["VM"]) == ["web-02", "db-01"]
+    assert list(filter_frame(frame, "{CPUs} > 1 && {Provisioned MB} < 4096")["VM"]) == ["web-01", "web-02"]
+    # a quoted number still compares as a number
+    assert list(filter_frame(frame, "{CPUs} = '8'")["VM"]) == ["db-01"]
+
+
+def test_filter_frame_non_numeric_value_on_numeric_column():
+    frame = make_frame()
+
+    assert filter_frame(frame, "{CPUs} < abc").equals(frame)
+    assert list(filter_frame(frame, "{CPUs} < abc && {CPUs} < 4")["VM"]) == ["web-01", "test-01"]
+
+
+def test_filter_frame_text():
+    frame = make_frame()
+
+    assert list(filter_frame(frame, "{VM} contains WEB")["VM"]) == ["web-01", "web-02"]
+    assert list(filter_frame(frame, "{VM} = db-01")["VM"]) == ["db-01"]
+    assert list(filter_frame(frame, "{VM} datestartswith test")["VM"]) == ["test-01"]
+
+
+def test_filter_frame_ignores_unknown_columns():
+    frame = make_frame()
+
+    assert filter_frame(frame, "{Cluster} = a").equals(frame)
+    assert filter_frame(frame, "").equals(frame)
+
+
+def test_table_page():
+    frame = make_frame()
+
+    records, page_count = table_page(frame, 1, 2, [{"column_id": "CPUs", "direction": "desc"}])
+    assert [record["VM"] for record in records] == ["web-01", "test-01"]
+    assert page_count == 2
+
+    records, page_count = table_page(frame, 0, 2, filter_query="{CPUs} < abc")
+    assert len(records) == 2 and page_count == 2
@@ -1,1008 +1,363 @@
 # import packages
-import base64
-import io
 
 # dashboard
 import dash_core_components as dcc
 import dash_html_components as html
 import dash_table
 import pandas as pd
-from collections import OrderedDict
 import plotly.graph_objs as go
 import dash_bootstrap_components as dbc
 
-# API
-import requests
-import json
+# sizing logic
+from core import SCOPES, SizingCore
 
-# calculations
-import math
+# number of rows per page of the rvtools tables
+PAGE_SIZE = 20
 
+# titles of the scopes and description of their sizing
+SCOPE_TITLES = {"provisioned": "Provisioned", "used": "Used", "consumed": "Consumed"}
+SIZING_DESCRIPTIONS = {
+    "provisioned": "This sizing was made on workload profiles grouping the VMs by quantile buckets of their CPU, "
+                   "Memory and Provisioned MB columns of vInfo, each profile sized as its rounded up average VM.",
+    "used": "This sizing was made on workload profiles grouping the VMs by quantile buckets of their CPU and In Use MB "
+            "columns of vInfo and their Consumed column in vMemory, each profile sized as its rounded up average VM.",
+    "consumed": "This sizing was made on workload profiles grouping the VMs by quantile buckets of their CPU column in "
+                "vInfo, their Consumed column in vMemory and their Consumed MB in vPartition, each profile sized as "
+                "its rounded up average VM."
+}
 
-class Backend:
+
+class Backend(SizingCore):
     """
+    Backend of the dashboard: the sizing logic of SizingCore and the html objects displaying it.
     In this section, static variables will be initiated.
     """
 
-    # template for API POST for the sizer
-    # quick
-    json_template_quick_post = {
-        "globalSpecs": {},
-        "workloads": [
-            {
-                "profileName": "Workload Profile - 1",
-                "vmProfile": {
-                    "vCpusPerCore": 4,
-                    "vCpusPerVM": 2,
-                    "vRAMPerVM": {
-                        "value": 200
-                    },
-                    "vmdkSize": {
-                        "value": 200
-                    },
-                    "vmsNum": 1000
-                },
-                "workloadType": "GPW_GVM"
-            }
-        ]
-    }
-
-    # manual
-    # todo
-
     # initiate as None row 3 that contains search VMs based on ram and storage usage
     row_3 = None
 
     def __init__(self):
-        """
-        This function initiates the backend class dealing with all the sizer options.
-        The initiation happens when an Rvtools is added to the dashboard and takes the elements to read it as inputs.
-
-        -----------------------------------
-        Initialised variables:
-
-        :var - contents:  base64 encoded string
-        Parameter from the dcc.Upload object that contains the files contents.
-
-        :var - filename: string
-        The name of the file(s) that was(were) uploaded. Note that this does not include the path of the file
-        (for security reasons).
+        super().__init__()
 
-        #todo: rest of variables annotations
-        """
-
-        # rvtools file information
-        self.filename, self.contents = [None] * 2
-
-        # class variables to share the opened databases (entire scope)
-        self.vinfo, self.vpartition, self.vmemory = [None] * 3
-        self.vinfo_provisioned, self.vpartition_provisioned, self.vmemory_provisioned = [None] * 3
-        self.vinfo_used, self.vpartition_used, self.vmemory_used = [None] * 3
-        self.vinfo_consumed, self.vpartition_consumed, self.vmemory_consumed = [None] * 3
+        # sizer response of each scope at the last submit and the tabs already displayed since
+        self.sizer_responses = dict()
+        self.rendered_tabs = dict()
 
-        # class variables to share the opened databases (removed scope)
-        self.vinfo_removed_used, self.vpartition_removed_used, self.vmemory_removed_used = [None] * 3
-        self.vinfo_removed_provisioned, self.vpartition_removed_provisioned, \
-        self.vmemory_removed_provisioned = [None] * 3
-        self.vinfo_removed_consumed, self.vpartition_removed_consumed, self.vmemory_removed_consumed = [None] * 3
+        # options and sizer responses the tabs are created for (see set_sizer_responses)
+        self.sizing_state = None
 
-        # initiate dictionary where all important values will be stored
-        self.value_dict_provisioned = dict()
-        self.value_dict_used = dict()
-        self.value_dict_consumed = dict()
+        # totals of each vCenter at the last submit (see SizingCore.vcenter_values)
+        self.vcenter_breakdown = pd.DataFrame()
 
-        # class variables to keep track of scope
-        # List of string names of VMs removed from scope
-        self.removed_vms_consumed = list()
-        self.removed_vms_provisioned = list()
-        self.removed_vms_used = list()
-
-        # Variable setting if powered off VMs should be removed
-        self.pow_off = [None]
-
-    def open_rvtools(self):
-        """
-        Function to open the rvtools fed to the upload object in the dashboard.
+    def create_rvtools_table(self, title, scope, removed=False):
         """
+        Function that uses the class variable databases to create the html Div displaying the Rvtools of a scope.
+        The tables are paged, filtered and sorted on the server (see the update_rvtools_table callback in app.py), so
+        only the rows of the visible page are sent to the browser.
 
-        content_type, content_string = self.contents[0].split(',')
+        :param title: string
+        The title displayed above the tables.
 
-        #content_string = parse_contents(self.contents)
+        :param scope: string
+        One of SCOPES.
 
-        decoded = base64.b64decode(content_string)
-
-        self.vinfo = pd.read_excel(io.BytesIO(decoded), "vInfo")
-        self.vpartition = pd.read_excel(io.BytesIO(decoded), "vPartition")
-        self.vmemory = pd.read_excel(io.BytesIO(decoded), "vMemory")
-
-    def create_rvtools_table(self, title, vinfo, vmemory, vpartition):
-        """
-        Function that uses the class variable databases to create the html Div displaying the Rvtools.
+        :param removed: bool
+        If True the tables display the VMs removed from the scope.
 
         :return: html.Div
         The application display for the datatable.
         """
+        vinfo, vmemory, vpartition = self.scope_frames(scope, removed)
+
         return html.Div([
             html.H5(title),
 
             dcc.Tabs([
-                dcc.Tab(label='vInfo', children=[
-                    dash_table.DataTable(
-                        data=vinfo.to_dict('records'),
-                        columns=[{'name': i, 'id': i, "deletable": False, "selectable": False} for i in
-                                 vinfo.columns],
-                        style_cell={'textAlign': 'left'},
-                        style_table={'height': '300px', 'overflowY': 'auto', 'overflowX': 'auto'},
-                        filter_action="native",
-                        sort_action="native",
-                        sort_mode="multi",
-                        # row_selectable="multi",
-                        # row_deletable=True,
-                        # selected_columns=[],
-                        # selected_rows=[]
-                    )
-                ]),
-                dcc.Tab(label='vMemory', children=[
-                    dash_table.DataTable(
-                        data=vmemory.to_dict('records'),
-                        columns=[{'name': i, 'id': i, "deletable": False, "selectable": False} for i in
-                                 vmemory.columns],
-                        style_cell={'textAlign': 'left'},
-                        style_table={'height': '300px', 'overflowY': 'auto', 'overflowX': 'auto'},
-                        filter_action="native",
-                        sort_action="native",
-                        sort_mode="multi",
-                        # row_selectable="multi",
-                        # row_deletable=True,
-                        # selected_columns=[],
-                        # selected_rows=[]
-                    )
-                ]),
-                dcc.Tab(label='vPartition', children=[
+                dcc.Tab(label=sheet, children=[
                     dash_table.DataTable(
-                        data=vpartition.to_dict('records'),
-                        columns=[{'name': i, 'id': i, "deletable": False, "selectable": False} for i in
-                                 vpartition.columns],
+                        id={'type': 'rvtools-table', 'scope': scope, 'sheet': sheet, 'removed': removed},
+                        columns=[{'name': i, 'id': i, "deletable": False, "selectable": False,
+                                  'type': 'numeric' if pd.api.types.is_numeric_dtype(frame[i]) else 'text'}
+                                 for i in frame.columns],
                         style_cell={'textAlign': 'left'},
                         style_table={'height': '300px', 'overflowY': 'auto', 'overflowX': 'auto'},
-                        filter_action="native",
-                        sort_action="native",
+                        page_current=0,
+                        page_size=PAGE_SIZE,
+                        page_action="custom",
+                        filter_action="custom",
+                        filter_query='',
+                        sort_action="custom",
                         sort_mode="multi",
+                        sort_by=[],
                         # row_selectable="multi",
                         # row_deletable=True,
                         # selected_columns=[],
                         # selected_rows=[]
                     )
-                ])
+                ]) for sheet, frame in (('vInfo', vinfo), ('vMemory', vmemory), ('vPartition', vpartition))
             ]),
 
         ])
 
-    def vinfo_summary(self):
+    def get_sizer_info(self, progress=None):
         """
-        Main function doing the calculations, research and preparing of datasets for display on dashboard.
-        # todo make this more efficient, neat and compartmentalized.
+        Function sizing the three scopes, run in a background job (see the give_sizing_info callback in app.py). The
+        content of the first tab is created before returning, so it is ready when the result is displayed.
+
+        :param progress: callable
+        Function called with the name of each stage ("summary", "sizing", "rendering") and the percentage done.
 
-        :output: dict
-        Formated dictionary with all values of interest to display on dashboard
+        :return: dict
+        Dictionary of scope name to the sizer response, JSON serialisable so the job result can be shared with the
+        other workers.
         """
-        # initiate function helper variable
-
-        # temporary variable to add "in use (MB)" storage value from vInfo for VMs not running as they will not appear
-        # in the vPartition tab
-        temp_sto = 0
-
-        # get number of VMs with "Powerstate" values
-        temp = self.vinfo["Powerstate"].unique()
-        if "poweredOn" in temp and "poweredOff" in temp:
-            vm_off = self.vinfo["Powerstate"].value_counts()["poweredOff"]
-        elif "poweredOff" in temp:
-            vm_off = self.vinfo["Powerstate"].value_counts()["poweredOff"]
-        else:
-            vm_off = 0
-
-        # remove VMs not running or poweroff if necessary & if not store In Use storage to use in consumed sizing as
-        # VMs powered off dont appear in vpartition
-        if self.pow_off == "yes":
-            self.vinfo = self.vinfo[self.vinfo["Powerstate"] != "poweredOff"]
-            self.vpartition = self.vinfo[self.vpartition["Powerstate"] != "poweredOff"]
-            self.vmemory = self.vinfo[self.vmemory["Powerstate"] != "poweredOff"]
-        else:
-            # todo: make sure they dont actually exist in vPartition already
-            temp_sto += self.vinfo[self.vinfo["Powerstate"] == "poweredOff"]["In Use MB"].sum()
-
-        # Create a database for VMs removed from scope
-        self.vinfo_removed_provisioned = self.vinfo[self.vinfo['VM'].isin(self.removed_vms_provisioned)]
-        self.vpartition_removed_provisioned = self.vpartition[self.vpartition['VM'].isin(self.removed_vms_provisioned)]
-        self.vmemory_removed_provisioned = self.vmemory[self.vmemory['VM'].isin(self.removed_vms_provisioned)]
-
-        # create dbs for the scoepd vm in each metrics
-        self.vinfo_provisioned = self.vinfo[~self.vinfo['VM'].isin(self.removed_vms_provisioned)]
-        self.vpartition_provisioned = self.vpartition[~self.vpartition['VM'].isin(self.removed_vms_provisioned)]
-        self.vmemory_provisioned = self.vmemory[~self.vmemory['VM'].isin(self.removed_vms_provisioned)]
-
-        self.vinfo_used = self.vinfo[~self.vinfo['VM'].isin(self.removed_vms_used)]
-        self.vpartition_used = self.vpartition[~self.vpartition['VM'].isin(self.removed_vms_used)]
-        self.vmemory_used = self.vmemory[~self.vmemory['VM'].isin(self.removed_vms_used)]
-
-        self.vinfo_consumed = self.vinfo[~self.vinfo['VM'].isin(self.removed_vms_consumed)]
-        self.vpartition_consumed = self.vpartition[~self.vpartition['VM'].isin(self.removed_vms_consumed)]
-        self.vmemory_consumed = self.vmemory[~self.vmemory['VM'].isin(self.removed_vms_consumed)]
-
-        # get storage in GiB & add In Use for VMs that dont have VM Tools (not in vPartition)
-        consumed_sto = (self.vpartition_consumed["Consumed MB"].sum() + temp_sto) / 1024
-        consumed_sto += self.vinfo_consumed[~self.vinfo_consumed['VM'].isin(self.vpartition_consumed['VM'])][
-                            'In Use MB'].sum() / 1024
-
-        # aggregate results for test
-        self.value_dict_provisioned = {"VM(s)": self.vinfo_provisioned.shape[0],
-                                       "CPU(s)": self.vinfo_provisioned.CPUs.sum(),
-                                       "RAM GiB": self.vinfo_provisioned.Memory.sum() / 1024,
-                                       "Storage GiB": self.vinfo_provisioned['Provisioned MB'].sum() / 1024,
-                                       "rcpu": math.ceil(
-                                           self.vinfo_provisioned.CPUs.sum() / self.vinfo_provisioned.shape[0]),
-                                       "rram": math.ceil(
-                                           (self.vinfo_provisioned.Memory.sum() / 1024) / self.vinfo_provisioned.shape[
-                                               0]),
-                                       "rsto": math.ceil(
-                                           (self.vinfo_provisioned['Provisioned MB'].sum() / 1024) /
-                                           self.vinfo_provisioned.shape[0]),
-                                       "VM poweredOff": vm_off}
-
-        # aggregate results for test
-        self.value_dict_used = {"VM(s)": self.vinfo_used.shape[0],
-                                "CPU(s)": self.vinfo_used.CPUs.sum(),
-                                "RAM GiB": self.vmemory_used.Consumed.sum() / 1024,
-                                "Storage GiB": self.vinfo_used['In Use MB'].sum() / 1024,
-                                "rcpu": math.ceil(self.vinfo_used.CPUs.sum() / self.vinfo_used.shape[0]),
-                                "rram": math.ceil(
-                                    (self.vmemory_used.Consumed.sum() / 1024) / self.vinfo_used.shape[0]),
-                                "rsto": math.ceil(
-                                    (self.vinfo_used['In Use MB'].sum() / 1024) / self.vinfo_used.shape[0]),
-                                "VM poweredOff": vm_off}
-
-        # aggregate results for test
-        self.value_dict_consumed = {"VM(s)": self.vinfo_consumed.shape[0],
-                                    "CPU(s)": self.vinfo_consumed.CPUs.sum(),
-                                    "RAM GiB": self.vmemory_consumed.Consumed.sum() / 1024,
-                                    "Storage GiB": consumed_sto,
-                                    "rcpu": math.ceil(self.vinfo_consumed.CPUs.sum() / self.vinfo_consumed.shape[0]),
-                                    "rram": math.ceil(
-                                        (self.vmemory_consumed.Consumed.sum() / 1024) / self.vinfo_consumed.shape[0]),
-                                    "rsto": math.ceil(consumed_sto / self.vinfo_consumed.shape[0]),
-                                    "VM poweredOff": vm_off}
-
-    def get_api_response(self, values):
-        # initialise POST with template
-        post = self.json_template_quick_post
-
-        # set values
-        post['workloads'][0]['vmProfile']['vCpusPerVM'] = values[1]
-        post['workloads'][0]['vmProfile']['vRAMPerVM']['value'] = values[2]
-        post['workloads'][0]['vmProfile']['vmdkSize']['value'] = values[3]
-        post['workloads'][0]['vmProfile']['vmsNum'] = values[0]
-
-        headers = {'content-type': 'application/json'}
-        response = requests.post("https://vmc.vmware.com/api/sizer/v4/recommendation?cloudProviderType=VMC_ON_AWS",
-                                 json=post, headers=headers)
-
-        return json.loads(response.text)['genericResponse']
-
-    def get_sizer_info(self):
-
-        # call function to gather data to display
-        self.vinfo_summary()
-
-        # arrange for sizer metrics
-        sizer_table_data_provisioned = pd.DataFrame(OrderedDict([
-            ('units', ['VM(s)', 'CPU(s)', 'RAM (GiB)', 'Storage (Gib)']),
-            ('values', [self.value_dict_provisioned[i] for i in ["VM(s)", "CPU(s)", "RAM GiB", "Storage GiB"]])
-        ]))
-        sizer_table_data_provisioned_rounded = pd.DataFrame(OrderedDict([
-            ('units', ['VM(s)', 'CPU(s)', 'RAM (GiB)', 'Storage (Gib)']),
-            ('values', [self.value_dict_provisioned[i] for i in ["VM(s)", "rcpu", "rram", "rsto"]])
-        ]))
-
-        sizer_table_data_used = pd.DataFrame(OrderedDict([
-            ('units', ['VM(s)', 'CPU(s)', 'RAM (GiB)', 'Storage (Gib)']),
-            ('values', [self.value_dict_used[i] for i in ["VM(s)", "CPU(s)", "RAM GiB", "Storage GiB"]])
-        ]))
-        sizer_table_data_used_rounded = pd.DataFrame(OrderedDict([
-            ('units', ['VM(s)', 'CPU(s)', 'RAM (GiB)', 'Storage (Gib)']),
-            ('values', [self.value_dict_used[i] for i in ["VM(s)", "rcpu", "rram", "rsto"]])
-        ]))
-
-        sizer_table_data_consumed = pd.DataFrame(OrderedDict([
-            ('units', ['VM(s)', 'CPU(s)', 'RAM (GiB)', 'Storage (Gib)']),
-            ('values', [self.value_dict_consumed[i] for i in ["VM(s)", "CPU(s)", "RAM GiB", "Storage GiB"]])
-        ]))
-        sizer_table_data_consumed_rounded = pd.DataFrame(OrderedDict([
-            ('units', ['VM(s)', 'CPU(s)', 'RAM (GiB)', 'Storage (Gib)']),
-            ('values', [self.value_dict_consumed[i] for i in ["VM(s)", "rcpu", "rram", "rsto"]])
-        ]))
-
-        # get response dictionary
-        out_gen_provisioned = self.get_api_response(
-            [self.value_dict_provisioned[i] for i in ["VM(s)", "rcpu", "rram", "rsto"]])
-        out_gen_consumed = self.get_api_response(
-            [self.value_dict_consumed[i] for i in ["VM(s)", "rcpu", "rram", "rsto"]])
-        out_gen_used = self.get_api_response(
-            [self.value_dict_used[i] for i in ["VM(s)", "rcpu", "rram", "rsto"]])
-
-        # arrange sizer metrics & graphs
-        temp_units_to_display = ['I3 Host Count', 'Total Cores', 'Total Memory', 'Total Storage', 'FTT & FTM']
-        sized_table_data_provisioned = pd.DataFrame(OrderedDict([
-            ('units', temp_units_to_display),
-            ('values', [out_gen_provisioned['sddcInformation']['nodesSize'],
-                        out_gen_provisioned['sddcInformation']['provisionedCores'],
-                        out_gen_provisioned['sddcInformation']['provisionedMemory']['value'],
-                        out_gen_provisioned['sddcInformation']['provisionedStorage']['value'],
-                        out_gen_provisioned['sddcInformation']['fttAndftm']])
-        ]))
-
-        x_data_provisioned = [
-            [out_gen_provisioned['cpuCoresUsage']['consumed'], out_gen_provisioned['cpuCoresUsage']['free']],
-            [out_gen_provisioned['memoryUsage']['consumed']['value'],
-             out_gen_provisioned['memoryUsage']['free']['value']],
-            [out_gen_provisioned['diskSpaceUsage']['consumedStorage']['value'],
-             out_gen_provisioned['diskSpaceUsage']['consumedSystemStorage']['value'],
-             out_gen_provisioned['diskSpaceUsage']['freeStorage']['value']]]
-
-        sized_table_data_used = pd.DataFrame(OrderedDict([
-            ('units', temp_units_to_display),
-            ('values',
-             [out_gen_used['sddcInformation']['nodesSize'], out_gen_used['sddcInformation']['provisionedCores'],
-              out_gen_used['sddcInformation']['provisionedMemory']['value'],
-              out_gen_used['sddcInformation']['provisionedStorage']['value'],
-              out_gen_used['sddcInformation']['fttAndftm']])
-        ]))
-
-        x_data_used = [[out_gen_used['cpuCoresUsage']['consumed'], out_gen_used['cpuCoresUsage']['free']],
-                       [out_gen_used['memoryUsage']['consumed']['value'], out_gen_used['memoryUsage']['free']['value']],
-                       [out_gen_used['diskSpaceUsage']['consumedStorage']['value'],
-                        out_gen_used['diskSpaceUsage']['consumedSystemStorage']['value'],
-                        out_gen_used['diskSpaceUsage']['freeStorage']['value']]]
-
-        sized_table_data_consumed = pd.DataFrame(OrderedDict([
-            ('units', temp_units_to_display),
-            ('values',
-             [out_gen_consumed['sddcInformation']['nodesSize'], out_gen_consumed['sddcInformation']['provisionedCores'],
-              out_gen_consumed['sddcInformation']['provisionedMemory']['value'],
-              out_gen_consumed['sddcInformation']['provisionedStorage']['value'],
-              out_gen_consumed['sddcInformation']['fttAndftm']])
-        ]))
-
-        x_data_consumed = [[out_gen_consumed['cpuCoresUsage']['consumed'], out_gen_consumed['cpuCoresUsage']['free']],
-                           [out_gen_consumed['memoryUsage']['consumed']['value'],
-                            out_gen_consumed['memoryUsage']['free']['value']],
-                           [out_gen_consumed['diskSpaceUsage']['consumedStorage']['value'],
-                            out_gen_consumed['diskSpaceUsage']['consumedSystemStorage']['value'],
-                            out_gen_consumed['diskSpaceUsage']['freeStorage']['value']]]
-
-        rvtools_provisioned = self.create_rvtools_table("Provisioned Scope RvTools", self.vinfo_provisioned,
-                                                        self.vmemory_provisioned, self.vpartition_provisioned)
-        rvtools_used = self.create_rvtools_table("Used Scope RvTools", self.vinfo_used,
-                                                 self.vmemory_used, self.vpartition_used)
-        rvtools_consumed = self.create_rvtools_table("Consumed Scope RvTools", self.vinfo_consumed,
-                                                     self.vmemory_consumed, self.vpartition_consumed)
-        # input values into dash objects to display
+        # call function to gather data to display and get response dictionary
+        responses = self.size_scopes(progress)
+        self.set_sizer_responses(responses)
+
+        # the tab selected by default is ready when the result is displayed
+        if progress is not None:
+            progress("rendering", 80)
+        self.scope_layout(SCOPES[0])
+
+        return responses
+
+    def set_sizer_responses(self, responses):
+        """
+        Function setting the sizer responses displayed for the current options, the tabs created for other options or
+        responses are discarded.
+
+        :param responses: dict
+        Dictionary of scope name to the sizer response, as returned by get_sizer_info in this worker or another one.
+        """
+        if self.sizing_state == (self.sizing_options, responses):
+            return
+
+        self.sizing_state = (self.sizing_options, responses)
+        self.sizer_responses = responses
+        self.rendered_tabs = dict()
+
+        # totals of each vCenter of a merged estate
+        self.vcenter_breakdown = self.vcenter_values()
+
+    def sizing_layout(self, responses):
+        """
+        Function creating the tabs displaying the result of a sizing job. The content of a tab is only created when the
+        tab is selected (see scope_layout and the render_scope_tab callback in app.py).
+
+        :param responses: dict
+        The result of the job (see get_sizer_info).
+
+        :return: html.Div
+        """
+        self.set_sizer_responses(responses)
 
         return html.Div([
-            dcc.Tabs([
-                dcc.Tab(label="provisioned", children=[
-                    rvtools_provisioned,
-                    dbc.Row(
-                        [
-                            dbc.Col(
-                                html.Div([
-                                    html.H5(
-                                        ["Sizing Metrics Total"], className="subtitle padded"
-                                    ),
-
-                                    dash_table.DataTable(
-                                        data=sizer_table_data_provisioned.to_dict('records'),
-                                        columns=[{
-                                            'id': 'units',
-                                            'name': 'Unit',
-                                            'type': 'text'
-                                        }, {
-                                            'id': 'values',
-                                            'name': 'Value',
-                                            'type': 'numeric'
-                                        }],
-                                        style_cell={'textAlign': 'left', 'padding': '5px'},
-                                        style_table={'height': 'auto', "width": 'auto', 'overflowY': 'auto',
-                                                     'overflowX': 'auto'},
-                                        style_header={'backgroundColor': 'rgb(230, 230, 230)', 'fontWeight': 'bold'},
-                                        style_cell_conditional=[
-                                            {
-                                                'if': {'column_id': c},
-                                                'textAlign': 'center'
-                                            } for c in ['Value']
-                                        ],
-                                    )
-                                ]), style={"height": "100%"},
+            dcc.Tabs(id='scope_tabs', value=SCOPES[0], children=[
+                dcc.Tab(label=scope, value=scope) for scope in SCOPES
+            ]),
+            html.Div(id='scope_content')
+        ])
+
+    def scope_layout(self, scope):
+        """
+        Function creating the content of the tab of a scope, kept until the next submit.
+
+        :param scope: string
+        One of SCOPES.
+
+        :return: html.Div
+        A notice asking to submit again if the sizer responses for the current options are not available (e.g. the job
+        result expired before this worker displayed it).
+        """
+        if self.sizing_state is None or self.sizing_state[0] != self.sizing_options or \
+                scope not in self.sizer_responses:
+            return html.Div(dbc.Alert('The results of this sizing are no longer available, please submit again.',
+                                      color='warning'))
+
+        if scope in self.rendered_tabs:
+            return self.rendered_tabs[scope]
+
+        # arrange for sizer metrics & graphs
+        totals, profiles, sized, usage = self.scope_tables(scope, self.sizer_responses[scope])
+
+        # input values into dash objects to display
+        # the rows of the rvtools tables are loaded page by page
+        self.rendered_tabs[scope] = html.Div([
+            self.create_rvtools_table(SCOPE_TITLES[scope] + " Scope RvTools", scope),
+            dbc.Row(
+                [
+                    dbc.Col(
+                        html.Div([
+                            html.H5(
+                                ["Sizing Metrics Total"], className="subtitle padded"
                             ),
-                            dbc.Col(
-                                html.Div([
-                                    html.H5(
-                                        ["Sizing Metrics Rounded"], className="subtitle padded"
-                                    ),
-                                    dash_table.DataTable(
-                                        data=sizer_table_data_provisioned_rounded.to_dict('records'),
-                                        columns=[{
-                                            'id': 'units',
-                                            'name': 'Unit',
-                                            'type': 'text'
-                                        }, {
-                                            'id': 'values',
-                                            'name': 'Value',
-                                            'type': 'numeric'
-                                        }],
-                                        style_cell={'textAlign': 'left', 'padding': '5px'},
-                                        style_table={'height': 'auto', "width": 'auto', 'overflowY': 'auto',
-                                                     'overflowX': 'auto'},
-                                        style_header={'backgroundColor': 'rgb(230, 230, 230)', 'fontWeight': 'bold'},
-                                        style_cell_conditional=[
-                                            {
-                                                'if': {'column_id': c},
-                                                'textAlign': 'center'
-                                            } for c in ['Value']
-                                        ],
-                                    )
-                                ]),
-                                style={"height": "100%"},
+
+                            dash_table.DataTable(
+                                data=totals.to_dict('records'),
+                                columns=[{
+                                    'id': 'units',
+                                    'name': 'Unit',
+                                    'type': 'text'
+                                }, {
+                                    'id': 'values',
+                                    'name': 'Value',
+                                    'type': 'numeric'
+                                }],
+                                style_cell={'textAlign': 'left', 'padding': '5px'},
+                                style_table={'height': 'auto', "width": 'auto', 'overflowY': 'auto',
+                                             'overflowX': 'auto'},
+                                style_header={'backgroundColor': 'rgb(230, 230, 230)', 'fontWeight': 'bold'},
+                                style_cell_conditional=[
+                                    {
+                                        'if': {'column_id': c},
+                                        'textAlign': 'center'
+                                    } for c in ['Value']
+                                ],
                             )
-                        ]
+                        ]), style={"height": "100%"},
                     ),
-                    html.Br(),
-                    dbc.Row(
-                        [
-                            dbc.Col(
-                                html.Div([
-                                    html.H5(
-                                        ["Sizer Metrics Provisioned"], className="subtitle padded"
-                                    ),
-                                    html.I(
-                                        "This sizing was made based on the rounded up per VM values of the CPU, \
-                                        Memory and Provisioned MB columns of vInfo."
-                                    ),
-                                    dash_table.DataTable(
-                                        data=sized_table_data_provisioned.to_dict('records'),
-                                        columns=[{
-                                            'id': 'units',
-                                            'name': 'Unit',
-                                            'type': 'text'
-                                        }, {
-                                            'id': 'values',
-                                            'name': 'Value',
-                                            'type': 'numeric'
-                                        }],
-                                        style_cell={'textAlign': 'left', 'padding': '5px'},
-                                        style_table={'height': 'auto', "width": 'auto', 'overflowY': 'auto',
-                                                     'overflowX': 'auto'},
-                                        style_header={'backgroundColor': 'rgb(230, 230, 230)', 'fontWeight': 'bold'},
-                                        style_cell_conditional=[
-                                            {
-                                                'if': {'column_id': c},
-                                                'textAlign': 'center'
-                                            } for c in ['Value']
-                                        ],
-                                    )
-                                ]),
+                    dbc.Col(
+                        html.Div([
+                            html.H5(
+                                ["Workload Profiles Sized"], className="subtitle padded"
                             ),
-                            dbc.Col(
-                                html.Div([
-                                    html.H5(
-                                        ["Total Cores"], className="subtitle padded"
-                                    ),
-
-                                    # VMware license table
-                                    # tab VMware VM's ??
-                                    dcc.Graph(
-                                        figure=go.Figure(
-                                            data=go.Pie(labels=['Consumed', 'Free'], values=x_data_provisioned[0]),
-                                            layout={}))
-
-                                ]),
-                            ),
-                            dbc.Col(
-                                html.Div([
-                                    html.H5(
-                                        ["Total Memory"], className="subtitle padded"
-                                    ),
-
-                                    # VMware license table
-                                    # tab VMware VM's ??
-                                    dcc.Graph(
-                                        figure=go.Figure(
-                                            data=go.Pie(labels=['Consumed', 'Free'], values=x_data_provisioned[1]),
-                                            layout={}))
-
-                                ]),
-                            ),
-                            dbc.Col(
-                                html.Div([
-                                    html.H5(
-                                        ["Total Storage"], className="subtitle padded"
-                                    ),
-
-                                    # VMware license table
-                                    # tab VMware VM's ??
-                                    dcc.Graph(figure=go.Figure(
-                                        data=go.Pie(labels=['Consumed by workloads', 'Consumed by system', 'Free'],
-                                                    values=x_data_provisioned[2]),
-                                        layout={})
-                                    )
-                                ]),
+                            # one row per profile sent to the sizer, with the rounded up values of its average VM
+                            dash_table.DataTable(
+                                data=profiles.to_dict('records'),
+                                columns=[{
+                                    'id': column,
+                                    'name': column,
+                                    'type': 'text' if column == 'Profile' else 'numeric'
+                                } for column in profiles.columns],
+                                style_cell={'textAlign': 'left', 'padding': '5px'},
+                                style_table={'height': '300px', "width": 'auto', 'overflowY': 'auto',
+                                             'overflowX': 'auto'},
+                                style_header={'backgroundColor': 'rgb(230, 230, 230)', 'fontWeight': 'bold'},
+                                style_cell_conditional=[
+                                    {
+                                        'if': {'column_id': c},
+                                        'textAlign': 'center'
+                                    } for c in profiles.columns[1:]
+                                ],
                             )
-                        ]
-                    ),
-                    html.Br(),
-                    html.Div([
-                        html.H5('VM(s) Removed from Provisioned Scope'),
-
-                        dcc.Tabs([
-                            dcc.Tab(label='vInfo', children=[
-                                dash_table.DataTable(
-                                    data=self.vinfo_removed_provisioned.to_dict('records'),
-                                    columns=[{'name': i, 'id': i, "deletable": False, "selectable": False} for i in
-                                             self.vinfo_removed_provisioned.columns],
-                                    style_cell={'textAlign': 'left'},
-                                    style_table={'height': '300px', 'overflowY': 'auto', 'overflowX': 'auto'},
-                                    filter_action="native",
-                                    sort_action="native",
-                                    sort_mode="multi",
-                                    # row_selectable="multi",
-                                    # row_deletable=True,
-                                    # selected_columns=[],
-                                    # selected_rows=[]
-                                )
-                            ]),
-                            dcc.Tab(label='vMemory', children=[
-                                dash_table.DataTable(
-                                    data=self.vmemory_removed_provisioned.to_dict('records'),
-                                    columns=[{'name': i, 'id': i, "deletable": False, "selectable": False} for i in
-                                             self.vmemory_removed_provisioned.columns],
-                                    style_cell={'textAlign': 'left'},
-                                    style_table={'height': '300px', 'overflowY': 'auto', 'overflowX': 'auto'},
-                                    filter_action="native",
-                                    sort_action="native",
-                                    sort_mode="multi",
-                                    # row_selectable="multi",
-                                    # row_deletable=True,
-                                    # selected_columns=[],
-                                    # selected_rows=[]
-                                )
-                            ]),
-                            dcc.Tab(label='vPartition', children=[
-                                dash_table.DataTable(
-                                    data=self.vpartition_removed_provisioned.to_dict('records'),
-                                    columns=[{'name': i, 'id': i, "deletable": False, "selectable": False} for i in
-                                             self.vpartition_removed_provisioned.columns],
-                                    style_cell={'textAlign': 'left'},
-                                    style_table={'height': '300px', 'overflowY': 'auto', 'overflowX': 'auto'},
-                                    filter_action="native",
-                                    sort_action="native",
-                                    sort_mode="multi",
-                                    # row_selectable="multi",
-                                    # row_deletable=True,
-                                    # selected_columns=[],
-                                    # selected_rows=[]
-                                )
-                            ])
-                        ])
-                    ])
-                ]),
-                dcc.Tab(label="used", children=[
-                    rvtools_used,
-                    dbc.Row(
-                        [
-                            dbc.Col(
-                                html.Div([
-                                    html.H5(
-                                        ["Sizing Metrics Total"], className="subtitle padded"
-                                    ),
-
-                                    dash_table.DataTable(
-                                        data=sizer_table_data_used.to_dict('records'),
-                                        columns=[{
-                                            'id': 'units',
-                                            'name': 'Unit',
-                                            'type': 'text'
-                                        }, {
-                                            'id': 'values',
-                                            'name': 'Value',
-                                            'type': 'numeric'
-                                        }],
-                                        style_cell={'textAlign': 'left', 'padding': '5px'},
-                                        style_table={'height': 'auto', "width": 'auto', 'overflowY': 'auto',
-                                                     'overflowX': 'auto'},
-                                        style_header={'backgroundColor': 'rgb(230, 230, 230)', 'fontWeight': 'bold'},
-                                        style_cell_conditional=[
-                                            {
-                                                'if': {'column_id': c},
-                                                'textAlign': 'center'
-                                            } for c in ['Value']
-                                        ],
-                                    )
-                                ]), style={"height": "100%"},
+                        ]),
+                        style={"height": "100%"},
+                    )
+                ]
+            ),
+            html.Br(),
+            dbc.Row(
+                [
+                    dbc.Col(
+                        html.Div([
+                            html.H5(
+                                ["Sizer Metrics " + SCOPE_TITLES[scope]], className="subtitle padded"
                             ),
-                            dbc.Col(
-                                html.Div([
-                                    html.H5(
-                                        ["Sizing Metrics Rounded"], className="subtitle padded"
-                                    ),
-                                    dash_table.DataTable(
-                                        data=sizer_table_data_used_rounded.to_dict('records'),
-                                        columns=[{
-                                            'id': 'units',
-                                            'name': 'Unit',
-                                            'type': 'text'
-                                        }, {
-                                            'id': 'values',
-                                            'name': 'Value',
-                                            'type': 'numeric'
-                                        }],
-                                        style_cell={'textAlign': 'left', 'padding': '5px'},
-                                        style_table={'height': 'auto', "width": 'auto', 'overflowY': 'auto',
-                                                     'overflowX': 'auto'},
-                                        style_header={'backgroundColor': 'rgb(230, 230, 230)', 'fontWeight': 'bold'},
-                                        style_cell_conditional=[
-                                            {
-                                                'if': {'column_id': c},
-                                                'textAlign': 'center'
-                                            } for c in ['Value']
-                                        ],
-                                    )
-                                ]),
-                                style={"height": "100%"},
+                            html.I(SIZING_DESCRIPTIONS[scope]),
+                            dash_table.DataTable(
+                                data=sized.to_dict('records'),
+                                columns=[{
+                                    'id': 'units',
+                                    'name': 'Unit',
+                                    'type': 'text'
+                                }, {
+                                    'id': 'values',
+                                    'name': 'Value',
+                                    'type': 'numeric'
+                                }],
+                                style_cell={'textAlign': 'left', 'padding': '5px'},
+                                style_table={'height': 'auto', "width": 'auto', 'overflowY': 'auto',
+                                             'overflowX': 'auto'},
+                                style_header={'backgroundColor': 'rgb(230, 230, 230)', 'fontWeight': 'bold'},
+                                style_cell_conditional=[
+                                    {
+                                        'if': {'column_id': c},
+                                        'textAlign': 'center'
+                                    } for c in ['Value']
+                                ],
                             )
-                        ]
+                        ]),
                     ),
-                    html.Br(),
-                    dbc.Row(
-                        [
-                            dbc.Col(
-                                html.Div([
-                                    html.H5(
-                                        ["Sizer Metrics Used"], className="subtitle padded"
-                                    ),
-                                    html.I(
-                                        "This sizing was made based on the rounded up per VM values of the CPU and In \
-                                        Use MB columns of vInfo and the Consumed column from vMemory. "
-                                    ),
-                                    dash_table.DataTable(
-                                        data=sized_table_data_used.to_dict('records'),
-                                        columns=[{
-                                            'id': 'units',
-                                            'name': 'Unit',
-                                            'type': 'text'
-                                        }, {
-                                            'id': 'values',
-                                            'name': 'Value',
-                                            'type': 'numeric'
-                                        }],
-                                        style_cell={'textAlign': 'left', 'padding': '5px'},
-                                        style_table={'height': 'auto', "width": 'auto', 'overflowY': 'auto',
-                                                     'overflowX': 'auto'},
-                                        style_header={'backgroundColor': 'rgb(230, 230, 230)', 'fontWeight': 'bold'},
-                                        style_cell_conditional=[
-                                            {
-                                                'if': {'column_id': c},
-                                                'textAlign': 'center'
-                                            } for c in ['Value']
-                                        ],
-                                    )
-                                ]),
-                            ),
-                            dbc.Col(
-                                html.Div([
-                                    html.H5(
-                                        ["Total Cores"], className="subtitle padded"
-                                    ),
-
-                                    # VMware license table
-                                    # tab VMware VM's ??
-                                    dcc.Graph(
-                                        figure=go.Figure(
-                                            data=go.Pie(labels=['Consumed', 'Free'], values=x_data_used[0]),
-                                            layout={}))
-
-                                ]),
+                    dbc.Col(
+                        html.Div([
+                            html.H5(
+                                ["Total Cores"], className="subtitle padded"
                             ),
-                            dbc.Col(
-                                html.Div([
-                                    html.H5(
-                                        ["Total Memory"], className="subtitle padded"
-                                    ),
-
-                                    # VMware license table
-                                    # tab VMware VM's ??
-                                    dcc.Graph(
-                                        figure=go.Figure(
-                                            data=go.Pie(labels=['Consumed', 'Free'], values=x_data_used[1]),
-                                            layout={}))
-
-                                ]),
-                            ),
-                            dbc.Col(
-                                html.Div([
-                                    html.H5(
-                                        ["Total Storage"], className="subtitle padded"
-                                    ),
-
-                                    # VMware license table
-                                    # tab VMware VM's ??
-                                    dcc.Graph(figure=go.Figure(
-                                        data=go.Pie(labels=['Consumed by workloads', 'Consumed by system', 'Free'],
-                                                    values=x_data_used[2]),
-                                        layout={})
-                                    )
-                                ]),
-                            )
-                        ]
+
+                            # VMware license table
+                            # tab VMware VM's ??
+                            dcc.Graph(
+                                figure=go.Figure(
+                                    data=go.Pie(labels=['Consumed', 'Free'], values=usage[0]),
+                                    layout={}))
+
+                        ]),
                     ),
-                    html.Br(),
-                    html.Div([
-                        html.H5('VM(s) Removed from Used Scope'),
-
-                        dcc.Tabs([
-                            dcc.Tab(label='vInfo', children=[
-                                dash_table.DataTable(
-                                    data=self.vinfo_removed_used.to_dict('records'),
-                                    columns=[{'name': i, 'id': i, "deletable": False, "selectable": False} for i in
-                                             self.vinfo_removed_used.columns],
-                                    style_cell={'textAlign': 'left'},
-                                    style_table={'height': '300px', 'overflowY': 'auto', 'overflowX': 'auto'},
-                                    filter_action="native",
-                                    sort_action="native",
-                                    sort_mode="multi",
-                                    # row_selectable="multi",
-                                    # row_deletable=True,
-                                    # selected_columns=[],
-                                    # selected_rows=[]
-                                )
-                            ]),
-                            dcc.Tab(label='vMemory', children=[
-                                dash_table.DataTable(
-                                    data=self.vmemory_removed_used.to_dict('records'),
-                                    columns=[{'name': i, 'id': i, "deletable": False, "selectable": False} for i in
-                                             self.vmemory_removed_used.columns],
-                                    style_cell={'textAlign': 'left'},
-                                    style_table={'height': '300px', 'overflowY': 'auto', 'overflowX': 'auto'},
-                                    filter_action="native",
-                                    sort_action="native",
-                                    sort_mode="multi",
-                                    # row_selectable="multi",
-                                    # row_deletable=True,
-                                    # selected_columns=[],
-                                    # selected_rows=[]
-                                )
-                            ]),
-                            dcc.Tab(label='vPartition', children=[
-                                dash_table.DataTable(
-                                    data=self.vpartition_removed_used.to_dict('records'),
-                                    columns=[{'name': i, 'id': i, "deletable": False, "selectable": False} for i in
-                                             self.vpartition_removed_used.columns],
-                                    style_cell={'textAlign': 'left'},
-                                    style_table={'height': '300px', 'overflowY': 'auto', 'overflowX': 'auto'},
-                                    filter_action="native",
-                                    sort_action="native",
-                                    sort_mode="multi",
-                                    # row_selectable="multi",
-                                    # row_deletable=True,
-                                    # selected_columns=[],
-                                    # selected_rows=[]
-                                )
-                            ])
-                        ])
-                    ])
-                ]),
-                dcc.Tab(label="consumed", children=[
-                    rvtools_consumed,
-                    dbc.Row(
-                        [
-                            dbc.Col(
-                                html.Div([
-                                    html.H5(
-                                        ["Sizing Metrics Total"], className="subtitle padded"
-                                    ),
-
-                                    dash_table.DataTable(
-                                        data=sizer_table_data_consumed.to_dict('records'),
-                                        columns=[{
-                                            'id': 'units',
-                                            'name': 'Unit',
-                                            'type': 'text'
-                                        }, {
-                                            'id': 'values',
-                                            'name': 'Value',
-                                            'type': 'numeric'
-                                        }],
-                                        style_cell={'textAlign': 'left', 'padding': '5px'},
-                                        style_table={'height': 'auto', "width": 'auto', 'overflowY': 'auto',
-                                                     'overflowX': 'auto'},
-                                        style_header={'backgroundColor': 'rgb(230, 230, 230)', 'fontWeight': 'bold'},
-                                        style_cell_conditional=[
-                                            {
-                                                'if': {'column_id': c},
-                                                'textAlign': 'center'
-                                            } for c in ['Value']
-                                        ],
-                                    )
-                                ]), style={"height": "100%"},
+                    dbc.Col(
+                        html.Div([
+                            html.H5(
+                                ["Total Memory"], className="subtitle padded"
                             ),
-                            dbc.Col(
-                                html.Div([
-                                    html.H5(
-                                        ["Sizing Metrics Rounded"], className="subtitle padded"
-                                    ),
-                                    dash_table.DataTable(
-                                        data=sizer_table_data_consumed_rounded.to_dict('records'),
-                                        columns=[{
-                                            'id': 'units',
-                                            'name': 'Unit',
-                                            'type': 'text'
-                                        }, {
-                                            'id': 'values',
-                                            'name': 'Value',
-                                            'type': 'numeric'
-                                        }],
-                                        style_cell={'textAlign': 'left', 'padding': '5px'},
-                                        style_table={'height': 'auto', "width": 'auto', 'overflowY': 'auto',
-                                                     'overflowX': 'auto'},
-                                        style_header={'backgroundColor': 'rgb(230, 230, 230)', 'fontWeight': 'bold'},
-                                        style_cell_conditional=[
-                                            {
-                                                'if': {'column_id': c},
-                                                'textAlign': 'center'
-                                            } for c in ['Value']
-                                        ],
-                                    )
-                                ]),
-                                style={"height": "100%"},
-                            )
-                        ]
+
+                            # VMware license table
+                            # tab VMware VM's ??
+                            dcc.Graph(
+                                figure=go.Figure(
+                                    data=go.Pie(labels=['Consumed', 'Free'], values=usage[1]),
+                                    layout={}))
+
+                        ]),
                     ),
-                    html.Br(),
-                    dbc.Row(
-                        [
-                            dbc.Col(
-                                html.Div([
-                                    html.H5(
-                                        ["Sizer Metrics Consumed"], className="subtitle padded"
-                                    ),
-                                    html.I(
-                                        "This sizing was made based on the rounded up per VM values of the CPU column \
-                                        in vInfo, the Consumed column in vMemory and the Consumed MB in vPartition."
-                                    ),
-                                    dash_table.DataTable(
-                                        data=sized_table_data_consumed.to_dict('records'),
-                                        columns=[{
-                                            'id': 'units',
-                                            'name': 'Unit',
-                                            'type': 'text'
-                                        }, {
-                                            'id': 'values',
-                                            'name': 'Value',
-                                            'type': 'numeric'
-                                        }],
-                                        style_cell={'textAlign': 'left', 'padding': '5px'},
-                                        style_table={'height': 'auto', "width": 'auto', 'overflowY': 'auto',
-                                                     'overflowX': 'auto'},
-                                        style_header={'backgroundColor': 'rgb(230, 230, 230)', 'fontWeight': 'bold'},
-                                        style_cell_conditional=[
-                                            {
-                                                'if': {'column_id': c},
-                                                'textAlign': 'center'
-                                            } for c in ['Value']
-                                        ],
-                                    )
-                                ]),
-                            ),
-                            dbc.Col(
-                                html.Div([
-                                    html.H5(
-                                        ["Total Cores"], className="subtitle padded"
-                                    ),
-
-                                    # VMware license table
-                                    # tab VMware VM's ??
-                                    dcc.Graph(
-                                        figure=go.Figure(
-                                            data=go.Pie(labels=['Consumed', 'Free'], values=x_data_consumed[0]),
-                                            layout={}))
-
-                                ]),
-                            ),
-                            dbc.Col(
-                                html.Div([
-                                    html.H5(
-                                        ["Total Memory"], className="subtitle padded"
-                                    ),
-
-                                    # VMware license table
-                                    # tab VMware VM's ??
-                                    dcc.Graph(
-                                        figure=go.Figure(
-                                            data=go.Pie(labels=['Consumed', 'Free'], values=x_data_consumed[1]),
-                                            layout={}))
-
-                                ]),
+                    dbc.Col(
+                        html.Div([
+                            html.H5(
+                                ["Total Storage"], className="subtitle padded"
                             ),
-                            dbc.Col(
-                                html.Div([
-                                    html.H5(
-                                        ["Total Storage"], className="subtitle padded"
-                                    ),
-
-                                    # VMware license table
-                                    # tab VMware VM's ??
-                                    dcc.Graph(figure=go.Figure(
-                                        data=go.Pie(labels=['Consumed by workloads', 'Consumed by system', 'Free'],
-                                                    values=x_data_consumed[2]),
-                                        layout={})
-                                    )
-                                ]),
+
+                            # VMware license table
+                            # tab VMware VM's ??
+                            dcc.Graph(figure=go.Figure(
+                                data=go.Pie(labels=['Consumed by workloads', 'Consumed by system', 'Free'],
+                                            values=usage[2]),
+                                layout={})
                             )
-                        ]
-                    ),
-                    html.Br(),
-                    html.Div([
-                        html.H5('VM(s) Removed from Consumed Scope'),
-
-                        dcc.Tabs([
-                            dcc.Tab(label='vInfo', children=[
-                                dash_table.DataTable(
-                                    data=self.vinfo_removed_consumed.to_dict('records'),
-                                    columns=[{'name': i, 'id': i, "deletable": False, "selectable": False} for i in
-                                             self.vinfo_removed_consumed.columns],
-                                    style_cell={'textAlign': 'left'},
-                                    style_table={'height': '300px', 'overflowY': 'auto', 'overflowX': 'auto'},
-                                    filter_action="native",
-                                    sort_action="native",
-                                    sort_mode="multi",
-                                    # row_selectable="multi",
-                                    # row_deletable=True,
-                                    # selected_columns=[],
-                                    # selected_rows=[]
-                                )
-                            ]),
-                            dcc.Tab(label='vMemory', children=[
-                                dash_table.DataTable(
-                                    data=self.vmemory_removed_consumed.to_dict('records'),
-                                    columns=[{'name': i, 'id': i, "deletable": False, "selectable": False} for i in
-                                             self.vmemory_removed_consumed.columns],
-                                    style_cell={'textAlign': 'left'},
-                                    style_table={'height': '300px', 'overflowY': 'auto', 'overflowX': 'auto'},
-                                    filter_action="native",
-                                    sort_action="native",
-                                    sort_mode="multi",
-                                    # row_selectable="multi",
-                                    # row_deletable=True,
-                                    # selected_columns=[],
-                                    # selected_rows=[]
-                                )
-                            ]),
-                            dcc.Tab(label='vPartition', children=[
-                                dash_table.DataTable(
-                                    data=self.vpartition_removed_consumed.to_dict('records'),
-                                    columns=[{'name': i, 'id': i, "deletable": False, "selectable": False} for i in
-                                             self.vpartition_removed_consumed.columns],
-                                    style_cell={'textAlign': 'left'},
-                                    style_table={'height': '300px', 'overflowY': 'auto', 'overflowX': 'auto'},
-                                    filter_action="native",
-                                    sort_action="native",
-                                    sort_mode="multi",
-                                    # row_selectable="multi",
-                                    # row_deletable=True,
-                                    # selected_columns=[],
-                                    # selected_rows=[]
-                                )
-                            ])
-                        ])
-                    ])
-                ]),
-            ])
+                        ]),
+                    )
+                ]
+            ),
+            html.Br(),
+            self.create_vcenter_table(scope),
+            self.create_rvtools_table("VM(s) Removed from " + SCOPE_TITLES[scope] + " Scope", scope, removed=True)
+        ])
+
+        return self.rendered_tabs[scope]
+
+    def create_vcenter_table(self, scope):
+        """
+        Function creating the html Div displaying the totals of each vCenter of a merged estate in a scope.
+
+        :param scope: string
+        One of SCOPES.
+
+        :return: html.Div
+        Empty for a single vCenter.
+        """
+        if self.vcenter_breakdown.empty:
+            return html.Div()
+
+        frame = self.vcenter_breakdown[self.vcenter_breakdown['scope'] == scope]
+        frame = frame[['vCenter', 'VM(s)', 'CPU(s)', 'RAM GiB', 'Storage GiB', 'VM poweredOff']].round(2)
+
+        return html.Div([
+            html.H5(["Sizing Metrics per vCenter"], className="subtitle padded"),
+            dash_table.DataTable(
+                data=frame.to_dict('records'),
+                columns=[{'id': column, 'name': column,
+                          'type': 'numeric' if pd.api.types.is_numeric_dtype(frame[column]) else 'text'}
+                         for column in frame.columns],
+                style_cell={'textAlign': 'left', 'padding': '5px'},
+                style_header={'backgroundColor': 'rgb(230, 230, 230)', 'fontWeight': 'bold'}
+            ),
+            html.Br()
         ])
@@ -0,0 +1,90 @@
+# import packages
+import fnmatch
+import re
+
+import numpy as np
+import pandas as pd
+
+# maximum number of VM names offered by the picker for a search
+SEARCH_LIMIT = 50
+
+
+def split_patterns(patterns):
+    """
+    Function splitting the text typed in the pattern box into glob patterns, e.g. "test-*, *-old".
+
+    :param patterns: string
+    The patterns separated by commas or spaces.
+
+    :return: list of strings
+    """
+    return [pattern for pattern in re.split(r"[,\s]+", patterns or "") if pattern]
+
+
+class VmIndex:
+    """
+    Search index over the VM names of an rvtools, answering the search as you type of the VM picker.
+    The names are sorted by their lower case form once: the names starting with the query are found by binary search,
+    the names only containing it by a vectorised scan, and only the first matches are returned to the browser.
+    """
+
+    def __init__(self, names):
+        """
+        :param names: iterable of strings
+        The VM names, duplicates and empty cells are dropped.
+        """
+        names = pd.Index(names).dropna().astype(str).unique()
+        lower = np.asarray(names.str.lower(), dtype=object)
+        order = np.argsort(lower, kind="stable")
+
+        self.names = np.asarray(names, dtype=object)[order]
+        self.lower = lower[order]
+
+    def __len__(self):
+        return len(self.names)
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        """
+        Function returning the VM names matching a search, the names starting with it first.
+
+        :param query: string
+        The text typed in the picker, case insensitive.
+
+        :param limit: int
+        The maximum number of names returned.
+
+        :return: list of strings
+        """
+        query = (query or "").strip().lower()
+        if not query:
+            return list(self.names[:limit])
+
+        # the names starting with the query are contiguous in the sorted names
+        start = np.searchsorted(self.lower, query, side="left")
+        end = np.searchsorted(self.lower, query + "\uffff", side="left")
+        matches = list(self.names[start:min(end, start + limit)])
+
+        if len(matches) < limit:
+            contains = pd.Series(self.lower).str.contains(query, regex=False).to_numpy(dtype=bool, copy=True)
+            contains[start:end] = False
+            matches.extend(self.names[contains][:limit - len(matches)])
+
+        return matches
+
+    def match(self, patterns):
+        """
+        Function returning the VM names matching any of the glob patterns, case insensitive.
+
+        :param patterns: list of strings
+        Patterns like "test-*" or "*-old".
+
+        :return: list of strings
+        """
+        if not patterns:
+            return list()
+
+        expression = re.compile("|".join("(?:{})".format(fnmatch.translate(pattern.lower())) for pattern in patterns))
+        matched = np.fromiter((expression.match(name) is not None for name in self.lower), dtype=bool,
+                              count=len(self.lower))
+
+        return list(self.names[matched])